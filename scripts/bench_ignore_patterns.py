@@ -0,0 +1,131 @@
+"""scripts.bench_ignore_patterns
+Benchmark of ignore-pattern matching on a synthetic file tree.
+
+Compares the former per-pattern fnmatch implementation of `should_ignore`
+with the compiled IgnoreMatcher (src.utils.file_filter) and checks that both
+classify every path the same way.
+
+Usage (from the repository root):
+    python scripts/bench_ignore_patterns.py [--paths 200000] [--seed 1]
+"""
+
+import argparse
+import fnmatch
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core.config import DEFAULT_IGNORED_PATTERNS  # noqa: E402
+from src.utils.file_filter import compile_ignore_patterns  # noqa: E402
+
+DIRS = [
+    "src",
+    "lib",
+    "pkg",
+    "node_modules",
+    "tests",
+    "docs",
+    "build",
+    "a b",
+    "__pycache__",
+    ".git",
+    "vendor",
+    "x.egg-info",
+    "./sub",
+]
+EXTENSIONS = [
+    ".py",
+    ".js",
+    ".ts",
+    ".md",
+    ".pyc",
+    ".lock",
+    ".png",
+    ".json",
+    ".md.manifest.json",
+    ".min.js",
+    "",
+]
+ROOT_FILES = ["uv.lock", "package-lock.json", ".DS_Store", "LICENSE"]
+# Globs that are neither literal names nor plain suffixes
+EXTRA_PATTERNS = ["docs/*.txt", "build*", "[Tt]emp"]
+
+
+def fnmatch_should_ignore(path: str, patterns: list[str]) -> bool:
+    """The former implementation: fnmatch per pattern, path, name and component."""
+    if not patterns:
+        return False
+    normalized_path = path.replace("\\", "/")
+    path_obj = Path(normalized_path)
+    for pattern in patterns:
+        if fnmatch.fnmatch(normalized_path, pattern):
+            return True
+        if fnmatch.fnmatch(path_obj.name, pattern):
+            return True
+        if pattern in path_obj.parts:
+            return True
+        if any(fnmatch.fnmatch(part, pattern) for part in path_obj.parts):
+            return True
+    return False
+
+
+def synthetic_paths(count: int, seed: int) -> list[str]:
+    """Relative paths of depth 0-6 with mixed extensions and ignored directories."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        parts = [
+            rng.choice(DIRS) + (str(rng.randint(0, 9)) if rng.random() < 0.5 else "")
+            for _ in range(rng.randint(0, 6))
+        ]
+        parts.append(f"file{i}{rng.choice(EXTENSIONS)}")
+        if rng.random() < 0.05:
+            parts = [rng.choice(ROOT_FILES)]
+        path = "/".join(parts)
+        if rng.random() < 0.02:
+            path = path.replace("/", "\\")
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    paths = synthetic_paths(args.paths, args.seed)
+    pattern_sets = {
+        "default patterns": list(DEFAULT_IGNORED_PATTERNS),
+        "default + generic globs": list(DEFAULT_IGNORED_PATTERNS) + EXTRA_PATTERNS,
+    }
+
+    for name, patterns in pattern_sets.items():
+        matcher = compile_ignore_patterns(patterns)
+
+        started = time.perf_counter()
+        expected = [fnmatch_should_ignore(path, patterns) for path in paths]
+        fnmatch_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        actual = [matcher.matches(path) for path in paths]
+        matcher_seconds = time.perf_counter() - started
+
+        mismatches = [p for p, a, b in zip(paths, expected, actual) if a != b]
+        print(
+            f"{name} ({len(patterns)}): {sum(expected)} of {len(paths)} ignored, "
+            f"fnmatch {fnmatch_seconds:.2f}s -> matcher {matcher_seconds:.2f}s "
+            f"(~{fnmatch_seconds / matcher_seconds:.0f}x), "
+            f"{len(mismatches)} mismatches"
+        )
+        for path in mismatches[:5]:
+            print(f"  mismatch: {path}")
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
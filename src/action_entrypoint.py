@@ -15,6 +15,7 @@ from loguru import logger
 
 from src.core.config import settings
 from src.models.api_schema import WikiGenerationRequest
+from src.services.page_manifest import PageManifest
 from src.services.wiki_generator import WikiGenerationService
 
 
@@ -38,6 +39,7 @@ async def main():
     logger.info(f"  Output Path: {output_path}")
     logger.info(f"  Language: {language}")
     logger.info(f"  Notion Sync: {notion_sync_enabled}")
+    logger.info(f"  Incremental: {settings.INCREMENTAL_GENERATION}")
 
     # 2. Construct Request
     # We use repo_type="local" because the Action checks out the code locally.
@@ -51,7 +53,13 @@ async def main():
     )
 
     # 3. Initialize Service and Generate
-    service = WikiGenerationService(request)
+    # The manifest beside the output file lets unchanged pages skip the LLM.
+    manifest = (
+        PageManifest.for_output(output_path)
+        if settings.INCREMENTAL_GENERATION
+        else None
+    )
+    service = WikiGenerationService(request, manifest=manifest)
     wiki_structure = None
     generated_pages = None
 
@@ -84,6 +92,13 @@ async def main():
         logger.error(f"Failed to write output file: {e}")
         sys.exit(1)
 
+    if manifest:
+        try:
+            manifest.save()
+        except Exception as e:
+            # The wiki itself was written; the next run will just regenerate more.
+            logger.warning(f"Failed to save manifest: {e}")
+
     # 5. Notion Sync (optional)
     if notion_sync_enabled and wiki_structure and generated_pages:
         if not notion_api_key or not notion_database_id:
@@ -2,15 +2,21 @@
 LLM Wrapper using LiteLLM for Wiki Generation Tasks.
 """
 
+import asyncio
 import os
 
 os.environ["LITELLM_LOG"] = "ERROR"
 
+from collections.abc import AsyncIterator
 from typing import Any, TypeVar
 
 import litellm
+from loguru import logger
 from pydantic import BaseModel
 
+from src.agent.llm_cache import LLMResponseCache, get_llm_cache
+from src.agent.rate_limiter import LLMRateLimiter, get_rate_limiter
+from src.agent.token_counter import get_token_counter
 from src.core.config import settings
 
 # Disable LiteLLM verbose logging and cost tracking
@@ -22,14 +28,56 @@ litellm.disable_end_user_cost_tracking = True
 T = TypeVar("T", bound=BaseModel)
 
 
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an LLM error signals provider overload (429, timeout, 503)."""
+    if isinstance(
+        error,
+        litellm.RateLimitError
+        | litellm.Timeout
+        | litellm.ServiceUnavailableError
+        | TimeoutError,
+    ):
+        return True
+    return getattr(error, "status_code", None) in (429, 503)
+
+
+# LiteLLM model prefix of each LLM_PROVIDER
+_PROVIDER_PREFIXES = {
+    "google": "vertex_ai",
+    "openai": "openai",
+    "anthropic": "anthropic",
+    "openrouter": "openrouter",
+    "xai": "xai",
+    "ollama": "ollama",
+}
+
+
+def resolve_model_name() -> str:
+    """
+    Full LiteLLM model name of the configured provider and MODEL_NAME.
+    Unlike constructing LLMWikiMaker, credentials are not checked.
+    """
+    provider = settings.LLM_PROVIDER.lower()
+    prefix = _PROVIDER_PREFIXES.get(provider)
+    if prefix is None:
+        raise ValueError(f"Unsupported LLM Provider: {provider}")
+    base_model = settings.MODEL_NAME
+    if base_model.startswith(f"{prefix}/"):
+        return base_model
+    return f"{prefix}/{base_model}"
+
+
 class LLMWikiMaker[T: BaseModel]:
     """
     Wrapper for LiteLLM to perform wiki generation tasks.
     Supports Structured Output with Type Safety via Generics.
     """
 
-    def __init__(self, response_schema: type[T] | None = None):
+    def __init__(self, response_schema: type[T] | None = None, use_cache: bool = True):
         self.response_schema = response_schema
+        self.use_cache = use_cache
+        # Whether the last ainvoke() was served from the response cache
+        self.last_response_cached = False
         self.model_name, self.completion_kwargs = self._configure_llm()
 
     def _configure_llm(self) -> tuple[str, dict]:
@@ -38,7 +86,6 @@ class LLMWikiMaker[T: BaseModel]:
         Handles provider-specific prefixes and environment variables.
         """
         provider = settings.LLM_PROVIDER.lower()
-        base_model = settings.MODEL_NAME
 
         # Global Settings
         kwargs = {
@@ -49,10 +96,7 @@ class LLMWikiMaker[T: BaseModel]:
 
         # 1. Google Vertex AI
         if provider == "google":
-            if not base_model.startswith("vertex_ai/"):
-                full_model_name = f"vertex_ai/{base_model}"
-            else:
-                full_model_name = base_model
+            full_model_name = resolve_model_name()
 
             kwargs["vertex_project"] = settings.GCP_PROJECT_NAME
             kwargs["vertex_location"] = settings.GCP_MODEL_LOCATION
@@ -72,10 +116,7 @@ class LLMWikiMaker[T: BaseModel]:
             if settings.LLM_BASE_URL:
                 kwargs["api_base"] = settings.LLM_BASE_URL
 
-            if not base_model.startswith("openai/"):
-                full_model_name = f"openai/{base_model}"
-            else:
-                full_model_name = base_model
+            full_model_name = resolve_model_name()
             return full_model_name, kwargs
 
         # 3. Anthropic (Claude)
@@ -88,10 +129,7 @@ class LLMWikiMaker[T: BaseModel]:
             if "ANTHROPIC_API_KEY" not in os.environ:
                 os.environ["ANTHROPIC_API_KEY"] = settings.ANTHROPIC_API_KEY
 
-            if not base_model.startswith("anthropic/"):
-                full_model_name = f"anthropic/{base_model}"
-            else:
-                full_model_name = base_model
+            full_model_name = resolve_model_name()
             return full_model_name, kwargs
 
         # 4. OpenRouter
@@ -104,10 +142,7 @@ class LLMWikiMaker[T: BaseModel]:
             if "OPENROUTER_API_KEY" not in os.environ:
                 os.environ["OPENROUTER_API_KEY"] = settings.OPENROUTER_API_KEY
 
-            if not base_model.startswith("openrouter/"):
-                full_model_name = f"openrouter/{base_model}"
-            else:
-                full_model_name = base_model
+            full_model_name = resolve_model_name()
             return full_model_name, kwargs
 
         # 5. xAI (Grok)
@@ -118,10 +153,7 @@ class LLMWikiMaker[T: BaseModel]:
             if "XAI_API_KEY" not in os.environ:
                 os.environ["XAI_API_KEY"] = settings.XAI_API_KEY
 
-            if not base_model.startswith("xai/"):
-                full_model_name = f"xai/{base_model}"
-            else:
-                full_model_name = base_model
+            full_model_name = resolve_model_name()
             return full_model_name, kwargs
 
         # 6. Ollama / On-premise (OpenAI-compatible)
@@ -129,10 +161,7 @@ class LLMWikiMaker[T: BaseModel]:
             if settings.LLM_BASE_URL:
                 kwargs["api_base"] = settings.LLM_BASE_URL
 
-            if not base_model.startswith("ollama/"):
-                full_model_name = f"ollama/{base_model}"
-            else:
-                full_model_name = base_model
+            full_model_name = resolve_model_name()
             return full_model_name, kwargs
 
         raise ValueError(f"Unsupported LLM Provider: {provider}")
@@ -141,50 +170,169 @@ class LLMWikiMaker[T: BaseModel]:
         """
         Asynchronously invokes the LLM using LiteLLM.
         Returns instance of T if response_schema is set, otherwise returns string.
+        Responses are served from the on-disk cache when the same inputs were seen before.
         """
         # 1. Process Input Data
-        if hasattr(input_data, "to_string"):
-            prompt_str = input_data.to_string()
-        else:
-            prompt_str = str(input_data)
-
-        messages = [{"role": "user", "content": prompt_str}]
+        prompt_str = self._to_prompt(input_data)
 
-        # 2. LLM Call Settings
-        call_kwargs = {
-            "model": self.model_name,
-            "messages": messages,
-            **self.completion_kwargs,
-        }
+        # 2. Cache Lookup
+        cache, cache_key = self._get_cache(prompt_str)
+        if cache and cache_key:
+            cached_content = await asyncio.to_thread(cache.get, cache_key)
+            if cached_content is not None:
+                logger.debug(f"LLM cache hit ({cache_key[:12]})")
+                self.last_response_cached = True
+                return self._parse_content(cached_content)
 
-        # 3. Structured Output Settings
-        if self.response_schema and settings.USE_STRUCTURED_OUTPUT:
-            call_kwargs["response_format"] = self.response_schema
+        # 3. Rate Limiting (queues the call instead of letting the provider reject it)
+        limiter, estimated_tokens = await self._acquire_rate_limit(prompt_str)
 
         # 4. LLM Call
-        response = await litellm.acompletion(**call_kwargs)
+        try:
+            response = await litellm.acompletion(**self._build_call_kwargs(prompt_str))
+        except Exception:
+            if limiter:
+                limiter.release(estimated_tokens)
+            raise
+
+        if limiter:
+            usage = getattr(response, "usage", None)
+            limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
 
         message = response.choices[0].message
         content = message.content or ""
 
-        # 5. Parse LLM Response
-        if self.response_schema:
-            # Case A: LiteLLM already parsed into JSON (some providers supports Structured Output)
-            if hasattr(message, "parsed") and message.parsed:
-                return message.parsed  # type: ignore
-
-            # Case B: Response in JSON string
-            try:
-                # If not using native structured output, model might return markdown json block
-                if not settings.USE_STRUCTURED_OUTPUT:
-                    content = self._extract_json(content)
-                return self.response_schema.model_validate_json(content)
-            except Exception as e:
-                raise ValueError(
-                    f"Failed to parse structured output: {e}\nRaw Content: {content}"
+        # Case A: LiteLLM already parsed into JSON (some providers supports Structured Output)
+        if self.response_schema and hasattr(message, "parsed") and message.parsed:
+            parsed = message.parsed
+            if cache and cache_key and isinstance(parsed, BaseModel):
+                await asyncio.to_thread(
+                    cache.put, cache_key, self.model_name, parsed.model_dump_json()
                 )
+            return parsed  # type: ignore
+
+        # 5. Parse LLM Response (only successfully parsed responses are cached)
+        result = self._parse_content(content)
+        if cache and cache_key:
+            await asyncio.to_thread(cache.put, cache_key, self.model_name, content)
+        return result
+
+    async def astream(self, input_data: Any) -> AsyncIterator[str]:
+        """
+        Streams the completion text chunk by chunk as it is generated.
+        Only plain-text responses (no response_schema) can be streamed.
+        A cached response is yielded as a single chunk.
+        """
+        if self.response_schema:
+            raise ValueError("Streaming is not supported with a response schema.")
+
+        prompt_str = self._to_prompt(input_data)
+
+        cache, cache_key = self._get_cache(prompt_str)
+        if cache and cache_key:
+            cached_content = await asyncio.to_thread(cache.get, cache_key)
+            if cached_content is not None:
+                logger.debug(f"LLM cache hit ({cache_key[:12]})")
+                self.last_response_cached = True
+                yield cached_content
+                return
+
+        limiter, estimated_tokens = await self._acquire_rate_limit(prompt_str)
+
+        parts: list[str] = []
+        usage = None
+        try:
+            response = await litellm.acompletion(
+                **self._build_call_kwargs(prompt_str), stream=True
+            )
+            async for chunk in response:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception:
+            # Once output has arrived, the estimate stands in for the real usage
+            if limiter and not parts:
+                limiter.release(estimated_tokens)
+            raise
+
+        if limiter:
+            limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
+        if cache and cache_key:
+            await asyncio.to_thread(
+                cache.put, cache_key, self.model_name, "".join(parts)
+            )
+
+    @staticmethod
+    def _to_prompt(input_data: Any) -> str:
+        if hasattr(input_data, "to_string"):
+            return input_data.to_string()
+        return str(input_data)
+
+    def _build_call_kwargs(self, prompt_str: str) -> dict[str, Any]:
+        call_kwargs = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt_str}],
+            **self.completion_kwargs,
+        }
+
+        # Structured Output Settings
+        if self.response_schema and settings.USE_STRUCTURED_OUTPUT:
+            call_kwargs["response_format"] = self.response_schema
 
-        return content
+        return call_kwargs
+
+    def _get_cache(self, prompt_str: str) -> tuple[LLMResponseCache | None, str | None]:
+        """Returns the response cache and this prompt's key (None if bypassed)."""
+        self.last_response_cached = False
+        cache = get_llm_cache() if self.use_cache else None
+        if not cache:
+            return None, None
+
+        cache_key = LLMResponseCache.make_key(
+            self.model_name,
+            {
+                **self.completion_kwargs,
+                "use_structured_output": settings.USE_STRUCTURED_OUTPUT,
+            },
+            self.response_schema,
+            prompt_str,
+        )
+        return cache, cache_key
+
+    async def _acquire_rate_limit(
+        self, prompt_str: str
+    ) -> tuple[LLMRateLimiter | None, int]:
+        """Waits for the shared rate limiter; returns it with the reserved tokens."""
+        limiter = get_rate_limiter(self.model_name)
+        if not limiter:
+            return None, 0
+
+        estimated_tokens = (
+            get_token_counter(self.model_name).count(prompt_str)
+            + settings.LLM_EXPECTED_COMPLETION_TOKENS
+        )
+        await limiter.acquire(estimated_tokens)
+        return limiter, estimated_tokens
+
+    def _parse_content(self, content: str) -> T | str:
+        """Converts raw response content into the configured response schema."""
+        if not self.response_schema:
+            return content
+
+        # Case B: Response in JSON string
+        try:
+            # If not using native structured output, model might return markdown json block
+            if not settings.USE_STRUCTURED_OUTPUT:
+                content = self._extract_json(content)
+            return self.response_schema.model_validate_json(content)
+        except Exception as e:
+            raise ValueError(
+                f"Failed to parse structured output: {e}\nRaw Content: {content}"
+            )
 
     def _extract_json(self, text: str) -> str:
         """Extracts JSON string from markdown code blocks if present."""
@@ -0,0 +1,161 @@
+"""src.agent.llm_cache
+Content-addressed on-disk cache for LLM responses.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel
+
+from src.core.config import settings
+
+# Completion kwargs that do not influence the generated output.
+_VOLATILE_KWARGS = {"max_retries", "timeout"}
+
+
+class LLMResponseCache:
+    """
+    Stores raw LLM responses on disk, keyed by a hash of every input that
+    influences the output (model, completion kwargs, response schema, prompt).
+
+    Entries live in `<cache_dir>/<key[:2]>/<key>.json`. The total size is bounded
+    by `max_bytes`; when exceeded, the least recently used entries (by mtime,
+    refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None  # Lazily computed on first write
+
+    @staticmethod
+    def make_key(
+        model: str,
+        completion_kwargs: dict[str, Any],
+        response_schema: type[BaseModel] | None,
+        prompt: str,
+    ) -> str:
+        """Builds a stable content hash for a single completion request."""
+        stable_kwargs = {
+            k: v for k, v in completion_kwargs.items() if k not in _VOLATILE_KWARGS
+        }
+        payload = {
+            "model": model,
+            "kwargs": stable_kwargs,
+            "schema": response_schema.model_json_schema() if response_schema else None,
+            "prompt": prompt,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached response content, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            # Refresh mtime so LRU eviction keeps recently used entries.
+            os.utime(path)
+            return entry.get("content")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable LLM cache entry {path}: {e}")
+            return None
+
+    def put(self, key: str, model: str, content: str) -> None:
+        """Atomically writes a response to the cache and enforces the size bound.
+
+        Empty or whitespace-only responses are not cached so that a single bad
+        completion is retried instead of being replayed for the same prompt.
+        """
+        if not content.strip():
+            logger.debug("Skipping LLM cache write for an empty response")
+            return
+
+        path = self._entry_path(key)
+        data = json.dumps({"model": model, "content": content}).encode("utf-8")
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            try:
+                replaced_bytes = path.stat().st_size
+            except FileNotFoundError:
+                replaced_bytes = 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write LLM cache entry: {e}")
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - replaced_bytes
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        """Removes every cache entry."""
+        with self._lock:
+            for entry in self.cache_dir.glob("*/*.json"):
+                entry.unlink(missing_ok=True)
+            self._total_bytes = 0
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.cache_dir.glob("*/*.json"))
+
+    def _evict(self) -> None:
+        """Deletes least recently used entries until the cache fits in 90% of max_bytes."""
+        entries = []
+        for entry in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort(key=lambda item: item[0])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+
+        self._total_bytes = total
+        logger.debug(f"LLM cache evicted {evicted} entries ({total} bytes remain)")
+
+
+_cache: LLMResponseCache | None = None
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """Returns the process-wide response cache, or None if caching is disabled."""
+    global _cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache(
+            os.path.expanduser(settings.LLM_CACHE_DIR),
+            settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _cache
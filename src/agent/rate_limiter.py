@@ -0,0 +1,114 @@
+"""src.agent.rate_limiter
+Process-wide token-bucket rate limiting of LLM requests and tokens per minute.
+"""
+
+import asyncio
+import time
+
+from loguru import logger
+
+from src.core.config import settings
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute / 60` units per second.
+
+    Callers reserve units up front; the balance may go negative, and the
+    returned delay is how long the caller must wait until its reservation is
+    covered. This queues callers in arrival order without any locking.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Debits `amount` units and returns the seconds to wait before using them."""
+        self._refill()
+        self._tokens -= min(amount, self.capacity)
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Debits (positive) or refunds (negative) units after the fact."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - delta)
+
+
+class LLMRateLimiter:
+    """Limits requests per minute (RPM) and tokens per minute (TPM) for one model."""
+
+    def __init__(self, rpm: int | None = None, tpm: int | None = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        """Waits until both the request and the token budget allow this call."""
+        request_wait = self.requests.reserve(1) if self.requests else 0.0
+        token_wait = self.tokens.reserve(estimated_tokens) if self.tokens else 0.0
+
+        delay = max(request_wait, token_wait)
+        if delay <= 0:
+            return
+
+        logger.debug(f"Rate limit reached, delaying LLM call by {delay:.1f}s")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # The call will never be sent; give the reservation back.
+            if self.requests:
+                self.requests.adjust(-1)
+            if self.tokens:
+                self.tokens.adjust(-estimated_tokens)
+            raise
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        """Corrects the token bucket once the real usage is known."""
+        if self.tokens and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def release(self, estimated_tokens: int) -> None:
+        """
+        Refunds the token reservation of a call that failed without output.
+        The request itself still counts against the request budget.
+        """
+        if self.tokens:
+            self.tokens.adjust(-estimated_tokens)
+
+
+_limiters: dict[str, LLMRateLimiter | None] = {}
+
+
+def get_rate_limiter(model_name: str) -> LLMRateLimiter | None:
+    """
+    Returns the limiter shared by every caller of `model_name` in this process,
+    or None if no limits are configured for it.
+
+    Per-model limits in `LLM_RATE_LIMITS` (keyed by the full LiteLLM model name,
+    e.g. "openai/gpt-4o", or by MODEL_NAME) take precedence over
+    LLM_RPM_LIMIT / LLM_TPM_LIMIT.
+    """
+    if model_name not in _limiters:
+        rate_limits = settings.LLM_RATE_LIMITS
+        overrides = rate_limits.get(model_name) or rate_limits.get(
+            settings.MODEL_NAME, {}
+        )
+        rpm = overrides.get("rpm", settings.LLM_RPM_LIMIT)
+        tpm = overrides.get("tpm", settings.LLM_TPM_LIMIT)
+
+        _limiters[model_name] = LLMRateLimiter(rpm, tpm) if rpm or tpm else None
+        if rpm or tpm:
+            logger.info(f"Rate limiting {model_name}: rpm={rpm}, tpm={tpm}")
+
+    return _limiters[model_name]
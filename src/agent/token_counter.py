@@ -0,0 +1,53 @@
+"""src.agent.token_counter
+Per-model token counting and context window lookup.
+"""
+
+from functools import cached_property, lru_cache
+
+import litellm
+from loguru import logger
+
+from src.core.config import settings
+
+# Used when neither LLM_CONTEXT_WINDOW nor LiteLLM's model map knows the model.
+DEFAULT_CONTEXT_WINDOW = 32_000
+
+
+class TokenCounter:
+    """Counts tokens with the model's tokenizer (falls back to ~4 chars per token)."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        try:
+            return litellm.token_counter(model=self.model_name, text=text)
+        except Exception:
+            return len(text) // 4
+
+    @cached_property
+    def context_window(self) -> int:
+        """Maximum input tokens of the model."""
+        if settings.LLM_CONTEXT_WINDOW:
+            return settings.LLM_CONTEXT_WINDOW
+        try:
+            info = litellm.get_model_info(self.model_name)
+            window = info.get("max_input_tokens") or info.get("max_tokens")
+            if window:
+                return int(window)
+        except Exception:
+            pass
+
+        logger.warning(
+            f"Unknown context window for {self.model_name}; "
+            f"assuming {DEFAULT_CONTEXT_WINDOW} tokens (set LLM_CONTEXT_WINDOW)."
+        )
+        return DEFAULT_CONTEXT_WINDOW
+
+
+@lru_cache(maxsize=16)
+def get_token_counter(model_name: str) -> TokenCounter:
+    """Returns the shared token counter for a model."""
+    return TokenCounter(model_name)
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import hashlib
 import hmac
@@ -7,8 +8,10 @@ import os
 import httpx
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status
 
+from src.core.config import settings
 from src.models.api_schema import WikiGenerationRequest
 from src.models.github_webhook_schema import GitHubPushPayload
+from src.services.job_queue import get_job_queue
 
 # Logging configuration
 logger = logging.getLogger("webhook")
@@ -136,6 +139,14 @@ async def github_webhook(
     if payload.ref != "refs/heads/main":
         return {"message": "Ignored non-main branch"}
 
+    # Apply backpressure before accepting more work
+    if settings.JOB_QUEUE_ENABLED and await asyncio.to_thread(get_job_queue().is_full):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Job queue is full. Please retry later.",
+            headers={"Retry-After": str(settings.JOB_QUEUE_RETRY_AFTER_SECONDS)},
+        )
+
     repo_owner = payload.repository.owner.login
     repo_name = payload.repository.name
 
@@ -2,49 +2,206 @@
 FastAPI endpoints for managing wiki generation tasks and status.
 """
 
+import asyncio
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
+from src.core.config import settings
 from src.models.api_schema import (
+    LLMSchedulerStatus,
+    PagePreview,
+    PartialPagesResponse,
+    TaskEvent,
+    TaskProgress,
     TaskStatusResponse,
     WikiGenerationRequest,
     WikiGenerationResponse,
 )
-from src.services.task_store import create_task, get_task
+from src.services.active_tasks import get_determiner, request_cancel
+from src.services.job_queue import QueueFullError, get_job_queue
+from src.services.llm_scheduler import get_llm_scheduler
+from src.services.result_cache import CachedWiki, CachedWikiSummary, get_result_cache
+from src.services.task_store import (
+    Task,
+    create_or_attach_task,
+    create_task,
+    get_task,
+    update_task_status,
+)
+from src.services.wiki_formatter import WikiFormatter
 from src.services.wiki_generator import WikiGenerationService
 from src.services.wiki_worker import process_wiki_generation_task
 
 router = APIRouter()
 
+# Seconds to wait for a cancelled run to record its partial result
+CANCEL_WAIT_SECONDS = 10.0
+# Seconds between SSE keepalive comments (keeps proxies from closing the stream)
+SSE_KEEPALIVE_SECONDS = 15.0
+# Seconds between task store checks for tasks without a live event stream
+SSE_STORE_POLL_SECONDS = 1.0
+
+
+async def _create_or_attach_task(
+    service: WikiGenerationService, save_file: bool, initial_message: str
+) -> tuple[Task, bool]:
+    """
+    Creates the task for a request. With request coalescing, an identical
+    request (same repository commit, language, view and mode) that is still in
+    progress is returned instead; the flag tells whether the task is new.
+    """
+    if not settings.REQUEST_COALESCING:
+        return await asyncio.to_thread(create_task, initial_message), True
+
+    coalesce_key = await service.resolve_coalesce_key(save_file)
+    task, created = await asyncio.to_thread(
+        create_or_attach_task, coalesce_key, initial_message
+    )
+    if not created:
+        logger.info(f"Coalesced duplicate request into in-flight task {task.task_id}")
+    return task, created
+
 
-async def _init_wiki_generation(
-    request: WikiGenerationRequest, initial_message: str
-) -> tuple[str, Any, WikiGenerationService]:
-    """Helper to initialize task and service for wiki generation."""
+def _attached_response(
+    task: Task, request: WikiGenerationRequest
+) -> WikiGenerationResponse:
+    """Response for a request that joined an identical in-flight task."""
+    # The structure summary is in the task result once the structure is known
+    summary = task.result if isinstance(task.result, dict) else {}
+    return WikiGenerationResponse(
+        message="An identical wiki generation is already in progress; "
+        "attached to its task.",
+        task_id=task.task_id,
+        title=summary.get("title") or request.repo_name or "Untitled",
+        description=summary.get("description") or "",
+    )
+
+
+async def _complete_from_cache(
+    service: WikiGenerationService, cached: CachedWiki, save_file: bool, mode: str
+) -> WikiGenerationResponse:
+    """Completes a task at once from a cached wiki of the same commit."""
+    task = await asyncio.to_thread(create_task, "Served from the wiki cache.")
+    result: dict[str, Any] = {
+        "cached": True,
+        "title": cached.structure.title,
+        "description": cached.structure.description,
+        "total_pages": len(cached.structure.pages),
+        "pages": [
+            PagePreview(
+                page_id=page.id,
+                title=page.title,
+                status="completed" if page.id in cached.pages else "pending",
+                content=cached.pages.get(page.id),
+            ).model_dump()
+            for page in cached.structure.pages
+        ],
+    }
     try:
-        WikiGenerationService.validate_request(request)
-        task = create_task(initial_message=initial_message)
-        service = WikiGenerationService(request)
+        if save_file:
+            result["file_path"] = await service.save_to_file(cached.markdown)
+    except OSError as e:
+        await asyncio.to_thread(
+            update_task_status, task.task_id, "failed", {"error": str(e)}
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+    await asyncio.to_thread(update_task_status, task.task_id, "completed", result)
 
-        # Determine initial structure
-        determiner = await service.prepare_generation()
+    return WikiGenerationResponse(
+        message=f"Wiki served from cache ({mode} mode).",
+        task_id=task.task_id,
+        title=cached.structure.title,
+        description=cached.structure.description,
+    )
 
-        # Validate structure existence
-        if not determiner.wiki_structure:
-            raise ValueError("Failed to determine wiki structure.")
 
-        return task.task_id, determiner, service
+async def _enqueue_wiki_generation(
+    task: Task, request: WikiGenerationRequest, save_file: bool, mode: str
+) -> WikiGenerationResponse:
+    """
+    Queues the whole generation (structure included) for the worker pool.
+    Responds 429 when the queue is full so clients back off.
+    """
+    try:
+        await asyncio.to_thread(
+            get_job_queue().enqueue, task.task_id, request, save_file
+        )
+    except QueueFullError as e:
+        await asyncio.to_thread(
+            update_task_status, task.task_id, "failed", {"error": str(e)}
+        )
+        raise HTTPException(
+            status_code=429,
+            detail=f"{e} Please retry later.",
+            headers={"Retry-After": str(settings.JOB_QUEUE_RETRY_AFTER_SECONDS)},
+        )
+
+    return WikiGenerationResponse(
+        message=f"Wiki generation queued ({mode} mode).",
+        task_id=task.task_id,
+        title=request.repo_name or "Untitled",
+        description="",
+    )
+
+
+async def _start_wiki_generation(
+    request: WikiGenerationRequest,
+    background_tasks: BackgroundTasks,
+    save_file: bool,
+    mode: str,
+    initial_message: str,
+) -> WikiGenerationResponse:
+    """
+    Shared flow of the /generate endpoints: serve from the wiki cache, attach
+    to an identical in-flight task, or start a new generation (queued for the
+    worker pool, or as a background task of this process).
 
+    Responds right after validation; the structure phase runs in the
+    background and its title and description are reported by `/status`.
+    """
+    try:
+        WikiGenerationService.validate_request(request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.exception("Failed to initialize wiki generation")
-        raise HTTPException(status_code=500, detail=f"Initialization failed: {str(e)}")
+
+    service = WikiGenerationService(request)
+
+    if cached := await service.lookup_cached_result():
+        return await _complete_from_cache(service, cached, save_file, mode)
+
+    task, created = await _create_or_attach_task(service, save_file, initial_message)
+    if not created:
+        return _attached_response(task, request)
+
+    if settings.JOB_QUEUE_ENABLED:
+        return await _enqueue_wiki_generation(task, request, save_file, mode)
+
+    background_tasks.add_task(
+        process_wiki_generation_task,
+        task_id=task.task_id,
+        request=request,
+        save_file=save_file,
+        commit_sha=service.commit_sha,
+    )
+
+    return WikiGenerationResponse(
+        message=f"Wiki generation started in the background ({mode} mode).",
+        task_id=task.task_id,
+        title=request.repo_name or "Untitled",
+        description="",
+    )
 
 
-@router.post("/generate/file", response_model=WikiGenerationResponse)
+@router.post(
+    "/generate/file",
+    response_model=WikiGenerationResponse,
+    status_code=202,
+)
 async def generate_wiki_file(
     request: WikiGenerationRequest, background_tasks: BackgroundTasks
 ):
@@ -54,32 +211,24 @@ async def generate_wiki_file(
     - Triggers a background task to generate the wiki.
     - **Saves** the result as a Markdown file in the server's `output/` directory.
     - Returns a Task ID to track progress.
+    - If the wiki of the same commit is cached, the task completes immediately.
+    - The wiki title and description are available from `/status/{task_id}`
+      once the structure has been determined.
     """
-    task_id, determiner, _ = await _init_wiki_generation(
-        request, "Wiki structure determination started."
-    )
-
-    background_tasks.add_task(
-        process_wiki_generation_task,
-        task_id=task_id,
-        request=request,
-        determiner=determiner,
+    return await _start_wiki_generation(
+        request,
+        background_tasks,
         save_file=True,
+        mode="File",
+        initial_message="Wiki structure determination started.",
     )
 
-    return WikiGenerationResponse(
-        message="Wiki generation started in the background (File mode).",
-        task_id=task_id,
-        title=determiner.wiki_structure.title
-        if determiner.wiki_structure
-        else "Untitled",
-        description=determiner.wiki_structure.description
-        if determiner.wiki_structure
-        else "",
-    )
 
-
-@router.post("/generate/text", response_model=WikiGenerationResponse)
+@router.post(
+    "/generate/text",
+    response_model=WikiGenerationResponse,
+    status_code=202,
+)
 async def generate_wiki_text(
     request: WikiGenerationRequest, background_tasks: BackgroundTasks
 ):
@@ -90,37 +239,275 @@ async def generate_wiki_text(
     - **Does NOT save** to the server's filesystem.
     - The generated text will be available in the task status result.
     - Returns a Task ID to track progress.
+    - If the wiki of the same commit is cached, the task completes immediately.
+    - The wiki title and description are available from `/status/{task_id}`
+      once the structure has been determined.
     """
-    task_id, determiner, _ = await _init_wiki_generation(
-        request, "Wiki text generation started."
-    )
-
-    background_tasks.add_task(
-        process_wiki_generation_task,
-        task_id=task_id,
-        request=request,
-        determiner=determiner,
+    return await _start_wiki_generation(
+        request,
+        background_tasks,
         save_file=False,
+        mode="Text",
+        initial_message="Wiki text generation started.",
     )
 
-    return WikiGenerationResponse(
-        message="Wiki generation started in the background (Text mode).",
-        task_id=task_id,
-        title=determiner.wiki_structure.title
-        if determiner.wiki_structure
-        else "Untitled",
-        description=determiner.wiki_structure.description
-        if determiner.wiki_structure
-        else "",
+
+@router.get("/scheduler", response_model=LLMSchedulerStatus)
+async def get_llm_scheduler_status():
+    """
+    Shows the process-wide LLM admission control: the global limit, calls in
+    flight or waiting, and each running task's share. With the worker pool,
+    this covers only the API process.
+    """
+    return get_llm_scheduler().snapshot()
+
+
+@router.get("/cache", response_model=list[CachedWikiSummary])
+async def list_cached_wikis():
+    """Lists cached wikis (most recently used first), without their content."""
+    cache = get_result_cache()
+    if cache is None:
+        return []
+    return await asyncio.to_thread(cache.list)
+
+
+@router.delete("/cache/{key}")
+async def delete_cached_wiki(key: str):
+    """Evicts a single cached wiki by its key."""
+    cache = get_result_cache()
+    if cache is None or not await asyncio.to_thread(cache.delete, key):
+        raise HTTPException(status_code=404, detail=f"Cache entry {key} not found.")
+    return {"message": f"Cache entry {key} deleted."}
+
+
+@router.delete("/cache")
+async def clear_cached_wikis():
+    """Evicts every cached wiki."""
+    cache = get_result_cache()
+    removed = await asyncio.to_thread(cache.clear) if cache else 0
+    return {"message": f"Removed {removed} cache entries."}
+
+
+def _stored_pages(task: Task) -> list[PagePreview]:
+    """Pages kept in the result of a completed or cancelled task."""
+    if not isinstance(task.result, dict):
+        return []
+    return [PagePreview.model_validate(page) for page in task.result.get("pages", [])]
+
+
+def _task_pages(task: Task) -> list[PagePreview]:
+    """Pages of a task, live from its determiner if it runs in this process."""
+    determiner = get_determiner(task.task_id)
+    if determiner and determiner.wiki_structure:
+        return determiner.page_previews(partial_content=False)
+    return _stored_pages(task)
+
+
+def _status_response(task: Task, include_pages: bool = False) -> TaskStatusResponse:
+    """
+    Builds the status response. Page markdown is only sent with
+    `include_pages`, as `progress`, not as part of the result.
+
+    A finished task stores its page content once, in the result's "pages";
+    the consolidated `markdown_content` is rebuilt from it here.
+    """
+    result = task.result
+    if isinstance(result, dict) and "pages" in result:
+        result = {key: value for key, value in result.items() if key != "pages"}
+        result["markdown_content"] = WikiFormatter.consolidate_pages(
+            result.get("title") or "",
+            result.get("description") or "",
+            [(page.title, page.content or "") for page in _stored_pages(task)],
+        )
+
+    progress = None
+    if include_pages:
+        pages = _task_pages(task)
+        summary = task.result if isinstance(task.result, dict) else {}
+        determiner = get_determiner(task.task_id)
+        progress = TaskProgress(
+            total_pages=len(pages) if determiner else summary.get("total_pages", 0),
+            completed_pages=sum(p.status in ("completed", "failed") for p in pages),
+            pages_in_progress=sorted(determiner.pages_in_progress)
+            if determiner
+            else [],
+            pages=pages,
+        )
+
+    return TaskStatusResponse(
+        task_id=task.task_id, status=task.status, result=result, progress=progress
     )
 
 
 @router.get("/status/{task_id}", response_model=TaskStatusResponse)
-async def get_wiki_generation_status(task_id: str):
-    """Retrieves the current status of a wiki generation task."""
-    task = get_task(task_id)
+async def get_wiki_generation_status(task_id: str, include_pages: bool = False):
+    """
+    Retrieves the current status of a wiki generation task.
+
+    With `include_pages=true`, `progress` lists every page with its status and
+    duration, plus the markdown of the pages finished so far. Per-page progress
+    of a running task is only available from the process that runs it.
+    """
+    task = await asyncio.to_thread(get_task, task_id)
     if not task:
         raise HTTPException(
             status_code=404, detail=f"Task with ID {task_id} not found."
         )
-    return task
+    return _status_response(task, include_pages)
+
+
+@router.get("/tasks/{task_id}/pages/{page_id}", response_model=PagePreview)
+async def get_wiki_page(task_id: str, page_id: str):
+    """
+    Returns a single page of a task: its status, duration and markdown (the
+    content streamed so far while it is generating).
+    """
+    task = await asyncio.to_thread(get_task, task_id)
+    if not task:
+        raise HTTPException(
+            status_code=404, detail=f"Task with ID {task_id} not found."
+        )
+
+    determiner = get_determiner(task_id)
+    if determiner and determiner.wiki_structure:
+        pages = determiner.page_previews()
+    else:
+        pages = _stored_pages(task)
+
+    for page in pages:
+        if page.page_id == page_id:
+            return page
+    raise HTTPException(
+        status_code=404, detail=f"Page {page_id} not found in task {task_id}."
+    )
+
+
+@router.delete("/tasks/{task_id}", response_model=TaskStatusResponse)
+async def cancel_wiki_generation_task(task_id: str):
+    """
+    Cancels a running task. In-flight LLM calls and file fetches are aborted,
+    their concurrency slots released and the fetcher closed; pages finished so
+    far are kept in the task result.
+    """
+    task = await asyncio.to_thread(get_task, task_id)
+    if not task:
+        raise HTTPException(
+            status_code=404, detail=f"Task with ID {task_id} not found."
+        )
+    if task.status != "in_progress":
+        raise HTTPException(
+            status_code=409, detail=f"Task {task_id} is already {task.status}."
+        )
+
+    run = request_cancel(task_id)
+    if run:
+        await asyncio.wait({run}, timeout=CANCEL_WAIT_SECONDS)
+    else:
+        # Not started yet, or running in the worker pool, which picks the
+        # cancellation up from the task store.
+        await asyncio.to_thread(
+            update_task_status, task_id, "cancelled", {"message": "Task cancelled."}
+        )
+
+    current = await asyncio.to_thread(get_task, task_id)
+    return _status_response(current or task)
+
+
+@router.get("/partial/{task_id}", response_model=PartialPagesResponse)
+async def get_wiki_partial_pages(task_id: str):
+    """
+    Returns the pages of a running task, including content that is still being
+    streamed from the LLM. Once the task has finished, use `/status/{task_id}`.
+    """
+    task = await asyncio.to_thread(get_task, task_id)
+    if not task:
+        raise HTTPException(
+            status_code=404, detail=f"Task with ID {task_id} not found."
+        )
+
+    determiner = get_determiner(task_id)
+    if not determiner or not determiner.wiki_structure:
+        return PartialPagesResponse(task_id=task_id, status=task.status)
+
+    return PartialPagesResponse(
+        task_id=task_id, status=task.status, pages=determiner.page_previews()
+    )
+
+
+def _format_sse(event: TaskEvent) -> str:
+    return f"event: {event.event}\ndata: {event.model_dump_json()}\n\n"
+
+
+async def _terminal_event(task_id: str) -> TaskEvent | None:
+    """Builds the terminal event of a finished task from the task store."""
+    task = await asyncio.to_thread(get_task, task_id)
+    if not task or task.status == "in_progress":
+        return None
+    if task.status == "completed":
+        file_path = (
+            task.result.get("file_path") if isinstance(task.result, dict) else None
+        )
+        return TaskEvent(
+            event="task_completed",
+            task_id=task_id,
+            timestamp=time.time(),
+            data={"file_path": file_path},
+        )
+    if task.status == "cancelled":
+        return TaskEvent(
+            event="task_cancelled", task_id=task_id, timestamp=time.time(), data={}
+        )
+    error = task.result.get("error") if isinstance(task.result, dict) else task.result
+    return TaskEvent(
+        event="task_failed",
+        task_id=task_id,
+        timestamp=time.time(),
+        data={"error": error},
+    )
+
+
+async def _task_event_stream(task_id: str) -> AsyncIterator[str]:
+    last_keepalive = time.monotonic()
+    while True:
+        determiner = get_determiner(task_id)
+        if determiner:
+            async for event in determiner.events.subscribe(
+                keepalive=SSE_KEEPALIVE_SECONDS
+            ):
+                yield ": keepalive\n\n" if event is None else _format_sse(event)
+            return
+
+        # Not running in this process (not started yet, already finished, or
+        # handled elsewhere): wait on the task store for a terminal state.
+        if (event := await _terminal_event(task_id)) is not None:
+            yield _format_sse(event)
+            return
+        if await asyncio.to_thread(get_task, task_id) is None:
+            return
+
+        if time.monotonic() - last_keepalive >= SSE_KEEPALIVE_SECONDS:
+            last_keepalive = time.monotonic()
+            yield ": keepalive\n\n"
+        await asyncio.sleep(SSE_STORE_POLL_SECONDS)
+
+
+@router.get("/events/{task_id}")
+async def stream_wiki_generation_events(task_id: str):
+    """
+    Streams task progress as Server-Sent Events.
+
+    Events: `structure_ready`, `page_started`, `page_finished` (with duration),
+    then `task_completed`, `task_failed` or `task_cancelled`, after which the
+    stream is closed.
+    Clients connecting late first receive a replay of earlier events.
+    """
+    if not await asyncio.to_thread(get_task, task_id):
+        raise HTTPException(
+            status_code=404, detail=f"Task with ID {task_id} not found."
+        )
+
+    return StreamingResponse(
+        _task_event_stream(task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
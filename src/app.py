@@ -4,6 +4,7 @@ Streamlit demo application for AI Wiki Generator.
 
 import asyncio
 import glob
+import json
 import os
 import re
 import sys
@@ -56,9 +57,62 @@ async def start_generation_task(request_data: WikiGenerationRequest) -> str | No
     return None
 
 
+async def follow_task_events(
+    client: httpx.AsyncClient, task_id: str, status_placeholder, progress_bar
+) -> bool:
+    """
+    Follows the task's Server-Sent Events and shows real page progress.
+    Returns True once a terminal event was received, False if the stream
+    is unavailable (the caller then falls back to polling).
+    """
+    events_url = f"{API_BASE_URL}/wiki/events/{task_id}"
+    total_pages = 0
+    finished_pages = 0
+
+    try:
+        async with client.stream("GET", events_url, timeout=None) as response:
+            if response.status_code != 200:
+                return False
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue  # event names, keepalive comments, blank separators
+                event = json.loads(line[len("data:") :])
+                name, data = event.get("event"), event.get("data", {})
+
+                if name == "structure_ready":
+                    total_pages = data.get("total_pages", 0)
+                    status_placeholder.markdown(
+                        f"📑 **{data.get('title', 'Wiki')}** — {total_pages} pages planned"
+                    )
+                elif name == "page_started":
+                    status_placeholder.markdown(
+                        f"✍️ Writing **{data.get('title')}** "
+                        f"({finished_pages}/{total_pages} done)"
+                    )
+                elif name == "page_finished":
+                    finished_pages = data.get("completed_pages", finished_pages + 1)
+                    total_pages = data.get("total_pages") or total_pages
+                    percent = (
+                        int(100 * finished_pages / total_pages) if total_pages else 0
+                    )
+                    progress_bar.progress(
+                        min(percent, 99),
+                        text=f"{finished_pages}/{total_pages} pages "
+                        f"(last: {data.get('title')}, {data.get('duration_seconds')}s)",
+                    )
+                elif name in ("task_completed", "task_failed", "task_cancelled"):
+                    return True
+    except (httpx.HTTPError, json.JSONDecodeError):
+        return False
+
+    return False
+
+
 async def poll_task_status(task_id: str) -> dict[str, Any] | None:
     """
-    Polls the status of the task.
+    Follows the task progress via SSE, then fetches the final status.
+    Falls back to polling if the event stream is unavailable.
     Returns the result dict if completed, None if failed.
     """
     status_url = f"{API_BASE_URL}/wiki/status/{task_id}"
@@ -73,6 +127,8 @@ async def poll_task_status(task_id: str) -> dict[str, Any] | None:
 
     try:
         async with httpx.AsyncClient() as client:
+            await follow_task_events(client, task_id, status_placeholder, progress_bar)
+
             while True:
                 elapsed = int(time.time() - start_time)
 
@@ -105,6 +161,12 @@ async def poll_task_status(task_id: str) -> dict[str, Any] | None:
                     progress_bar.empty()
                     return {"error": error_msg}
 
+                if status == "cancelled":
+                    st.warning("Task was cancelled.")
+                    status_placeholder.empty()
+                    progress_bar.empty()
+                    return {"error": "Task was cancelled."}
+
                 # In progress
                 status_placeholder.markdown(
                     f"⏳ **Generating...** (Elapsed: {elapsed}s)"
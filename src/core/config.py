@@ -71,9 +71,47 @@ class Settings(BaseSettings):
     temperature: float = 0.0
     max_retries: int = 3
     max_concurrency: int = 5
+    # AIMD: grow concurrency while healthy, halve it on 429/timeout/latency spikes
+    adaptive_concurrency: bool = True
+    min_concurrency: int = 1
+    max_concurrency_ceiling: int = 20
+    latency_spike_factor: float = 3.0
+    # Process-wide cap on LLM calls in flight across all tasks. "fair" hands free
+    # slots to the task with the fewest calls in flight, "fifo" to the oldest call.
+    global_max_concurrency: int = 20
+    llm_scheduler_policy: Literal["fair", "fifo"] = "fair"
     llm_timeout: int = 300
+    # Stream page content so partial pages are visible while they are generated
+    # (opt-in; not every provider supports streaming)
+    LLM_STREAMING: bool = False
+
+    # Process-wide rate limits (requests/tokens per minute). LLM_RATE_LIMITS holds
+    # per-model overrides as JSON, e.g. '{"openai/gpt-4o": {"rpm": 500, "tpm": 30000}}'
+    LLM_RPM_LIMIT: int | None = None
+    LLM_TPM_LIMIT: int | None = None
+    LLM_RATE_LIMITS: dict[str, dict[str, int]] = {}
+    LLM_EXPECTED_COMPLETION_TOKENS: int = 4000
+
+    # Share of the model's context window given to page source files.
+    # LLM_CONTEXT_WINDOW overrides the window reported by LiteLLM.
+    PROMPT_CONTEXT_SHARE: float = 0.5
+    LLM_CONTEXT_WINDOW: int | None = None
+
+    # LLM Response Cache (content-addressed, on disk; opt-in)
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_DIR: str = "~/.cache/wiki-as-readme/llm"
+    LLM_CACHE_MAX_MB: int = 512
 
     GIT_API_TOKEN: str | None = None
+    # Download the GitHub repository as one tarball instead of one request per file
+    GITHUB_ARCHIVE_MODE: bool = False
+    # Concurrent file fetches per run, separate from the LLM limits so that
+    # fetching runs ahead of the LLM calls
+    FILE_FETCH_CONCURRENCY: int = 16
+    # Source files over MAX_FILE_BYTES are cut to a head-and-tail excerpt (binary
+    # files are skipped); a page's files together are capped at MAX_PAGE_FILE_BYTES
+    MAX_FILE_BYTES: int = 256_000
+    MAX_PAGE_FILE_BYTES: int = 1_000_000
 
     language: Literal[
         "ko", "en", "ja", "zh", "zh-tw", "es", "vi", "pt-br", "fr", "ru"
@@ -100,11 +138,59 @@ class Settings(BaseSettings):
                 return [s.strip() for s in v.split(",") if s.strip()]
         return v
 
+    # Also skip what the local repository's .gitignore files exclude
+    RESPECT_GITIGNORE: bool = True
+    # List the files of a local git checkout from its index (with blob SHAs)
+    # instead of walking the disk; only with RESPECT_GITIGNORE. Either way,
+    # tracked files that .gitignore excludes are not listed.
+    LOCAL_GIT_INDEX_SCAN: bool = True
+    # Threads scanning top-level directories of a local repository in parallel
+    LOCAL_SCAN_WORKERS: int = 8
+
     GITHUB_WEBHOOK_SECRET: str | None = None
 
     # Path Settings
     LOCAL_REPO_PATH: str = "."
     WIKI_OUTPUT_PATH: str = "./WIKI.md"
+    # Reuse unchanged pages recorded in "<WIKI_OUTPUT_PATH>.manifest.json"
+    INCREMENTAL_GENERATION: bool = True
+
+    # Task Store ("sqlite" is shared by all API worker processes; "memory" is per process)
+    TASK_STORE_BACKEND: Literal["sqlite", "memory"] = "sqlite"
+    TASK_STORE_PATH: str = "output/.tasks.db"
+    # Retention: results above TASK_RESULT_SPILL_KB are stored as files in
+    # TASK_RESULT_DIR; the sweeper evicts tasks not updated for TASK_TTL_SECONDS
+    # (running ones keep a heartbeat), then the oldest finished ones beyond
+    # TASK_MAX_COUNT / TASK_STORE_MAX_MB.
+    TASK_RESULT_DIR: str = "output/.task_results"
+    TASK_RESULT_SPILL_KB: int = 64
+    TASK_TTL_SECONDS: int = 86400
+    TASK_MAX_COUNT: int = 1000
+    TASK_STORE_MAX_MB: int = 256
+    TASK_SWEEP_INTERVAL_SECONDS: int = 300
+
+    # Attach identical concurrent requests (same repo commit, language, view) to
+    # the task already in progress instead of generating the wiki twice
+    REQUEST_COALESCING: bool = True
+    # Running tasks refresh a heartbeat; an in-progress task silent for longer
+    # (e.g. its process was killed) no longer takes identical requests
+    TASK_STALE_SECONDS: int = 300
+
+    # Wiki Result Cache: finished wikis keyed by commit SHA, language, view,
+    # model and prompt version; a hit completes the request without LLM calls
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_DIR: str = "~/.cache/wiki-as-readme/results"
+    RESULT_CACHE_MAX_ENTRIES: int = 200
+
+    # Job Queue: run generation in a separate worker pool (python -m src.worker)
+    # instead of the API process. Requests get 429 once JOB_QUEUE_MAX_PENDING
+    # jobs are waiting.
+    JOB_QUEUE_ENABLED: bool = False
+    JOB_QUEUE_PATH: str = "output/.jobs.db"
+    JOB_QUEUE_MAX_PENDING: int = 100
+    JOB_QUEUE_RETRY_AFTER_SECONDS: int = 30
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
 
     # Notion Integration
     NOTION_API_KEY: str | None = None
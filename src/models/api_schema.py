@@ -83,11 +83,95 @@ class WikiGenerationResponse(BaseModel):
     description: str = Field(..., description="The description of the generated wiki.")
 
 
+class PagePreview(BaseModel):
+    page_id: str = Field(..., description="The ID of the wiki page.")
+    title: str = Field(..., description="The title of the wiki page.")
+    status: Literal["pending", "generating", "completed", "failed"] = Field(
+        ..., description="Generation status of the page."
+    )
+    content: str | None = Field(
+        None, description="Markdown generated so far (partial while generating)."
+    )
+    duration_seconds: float | None = Field(
+        None, description="Generation time of the page, once finished."
+    )
+
+
+class PartialPagesResponse(BaseModel):
+    task_id: str = Field(..., description="The ID of the task.")
+    status: Literal["in_progress", "completed", "failed", "cancelled"] = Field(
+        ..., description="Current status of the task."
+    )
+    pages: list[PagePreview] = Field(
+        default_factory=list,
+        description="Pages of a running task, including partially streamed content.",
+    )
+
+
+class TaskProgress(BaseModel):
+    total_pages: int = Field(..., description="Number of pages in the wiki structure.")
+    completed_pages: int = Field(..., description="Number of pages finished so far.")
+    pages_in_progress: list[str] = Field(
+        default_factory=list, description="IDs of pages not finished yet."
+    )
+    pages: list[PagePreview] = Field(
+        default_factory=list,
+        description="Per-page status and duration, with the markdown of finished pages.",
+    )
+
+
 class TaskStatusResponse(BaseModel):
     task_id: str = Field(..., description="The ID of the task.")
-    status: Literal["in_progress", "completed", "failed"] = Field(
+    status: Literal["in_progress", "completed", "failed", "cancelled"] = Field(
         ..., description="Current status of the task."
     )
     result: Any | None = Field(
         None, description="Result of the task, if completed or failed."
     )
+    progress: TaskProgress | None = Field(
+        None, description="Per-page progress, if requested with `include_pages`."
+    )
+
+
+TaskEventType = Literal[
+    "structure_ready",
+    "page_started",
+    "page_finished",
+    "task_completed",
+    "task_failed",
+    "task_cancelled",
+]
+
+
+class TaskEvent(BaseModel):
+    event: TaskEventType = Field(..., description="The type of progress event.")
+    task_id: str | None = Field(None, description="The ID of the task.")
+    timestamp: float = Field(..., description="Unix time the event was emitted.")
+    data: dict[str, Any] = Field(
+        default_factory=dict, description="Event-specific payload."
+    )
+
+
+class LLMTaskShareStatus(BaseModel):
+    task_id: str | None = Field(None, description="The ID of the task, once bound.")
+    weight: float = Field(..., description="Fair-share weight of the task.")
+    limit: int | None = Field(
+        None, description="Per-task concurrency limit (adaptive, if enabled)."
+    )
+    in_flight: int = Field(..., description="LLM calls of the task in flight.")
+    waiting: int = Field(..., description="LLM calls of the task waiting for a slot.")
+    granted: int = Field(..., description="LLM slots granted to the task so far.")
+
+
+class LLMSchedulerStatus(BaseModel):
+    policy: Literal["fair", "fifo"] = Field(
+        ..., description="How free slots are assigned to waiting tasks."
+    )
+    global_limit: int = Field(
+        ..., description="Maximum LLM calls in flight across all tasks."
+    )
+    in_flight: int = Field(..., description="LLM calls currently in flight.")
+    waiting: int = Field(..., description="LLM calls waiting for a global slot.")
+    tasks: list[LLMTaskShareStatus] = Field(
+        default_factory=list, description="Per-task usage of the scheduler."
+    )
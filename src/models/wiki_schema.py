@@ -95,3 +95,6 @@ class RepositoryStructure(BaseModel):
     readme: str
     default_branch: str = "main"
     error: str | None = None
+    # Git blob SHA per file path, where the provider knows it without reading
+    # the file (a free content hash for caches)
+    file_hashes: dict[str, str] = Field(default_factory=dict)
@@ -5,9 +5,19 @@ Base abstract class for repository providers (GitHub, GitLab, etc.).
 from abc import ABC, abstractmethod
 
 import httpx
+from loguru import logger
 
 from src.models.api_schema import WikiGenerationRequest
 from src.models.wiki_schema import RepositoryStructure
+from src.utils.file_content import read_stream_text
+
+
+class FileFetchError(Exception):
+    """
+    A file could not be fetched for a reason that may not last (network
+    error, rate limit, server error). Definitive outcomes, such as a missing
+    or binary file, are returned as None instead.
+    """
 
 
 class RepositoryProvider(ABC):
@@ -19,15 +29,43 @@ class RepositoryProvider(ABC):
         """Resource cleanup"""
         await self.client.aclose()
 
+    async def _stream_file_content(
+        self, url: str, headers: dict[str, str], file_path: str
+    ) -> str | None:
+        """
+        Downloads raw file content as a stream, so that binary files are
+        abandoned early and oversized ones are cut to an excerpt in bounded
+        memory (see src.utils.file_content).
+        """
+        async with self.client.stream(
+            "GET", url, headers=headers, follow_redirects=True
+        ) as resp:
+            if resp.status_code == 404:
+                logger.warning(f"Could not fetch '{file_path}': {resp.status_code}")
+                return None
+            if resp.status_code != 200:
+                raise FileFetchError(
+                    f"Could not fetch '{file_path}': {resp.status_code}"
+                )
+            return await read_stream_text(resp.aiter_bytes(), file_path)
+
     @abstractmethod
     async def fetch_structure(self) -> RepositoryStructure:
         """Method to fetch the file tree and README"""
         pass
 
+    async def resolve_commit_sha(self) -> str | None:
+        """
+        Returns the commit SHA the wiki would be generated from (the head of the
+        default branch), or None if it cannot be determined.
+        """
+        return None
+
     @abstractmethod
     async def fetch_file_content(self, file_path: str) -> str | None:
         """
         Method to fetch the content of a specific file.
         Specific logic must be implemented in each subclass (Local, GitHub, etc.).
+        Raises FileFetchError for failures that are worth retrying.
         """
         pass
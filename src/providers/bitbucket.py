@@ -2,12 +2,14 @@
 Bitbucket-specific repository provider implementation using Bitbucket Cloud API.
 """
 
+import httpx
 from loguru import logger
 
 from src.core.config import settings
 from src.models.wiki_schema import RepositoryStructure
-from src.providers.base import RepositoryProvider
-from src.utils.file_filter import should_ignore
+from src.providers.base import FileFetchError, RepositoryProvider
+from src.services.page_manifest import manifest_repo_path
+from src.utils.file_filter import compile_ignore_patterns
 
 
 class BitbucketProvider(RepositoryProvider):
@@ -25,6 +27,8 @@ class BitbucketProvider(RepositoryProvider):
 
         default_branch = "master"
         file_list = []
+        ignored = compile_ignore_patterns(settings.IGNORED_PATTERNS)
+        manifest = manifest_repo_path()
         readme_content = ""
 
         try:
@@ -56,7 +60,8 @@ class BitbucketProvider(RepositoryProvider):
                         item["path"]
                         for item in values
                         if item["type"] == "commit_file"
-                        and not should_ignore(item["path"], settings.IGNORED_PATTERNS)
+                        and item["path"] != manifest
+                        and not ignored.matches(item["path"])
                     ]
                 )
 
@@ -82,6 +87,26 @@ class BitbucketProvider(RepositoryProvider):
                 file_tree="", readme="", default_branch="master", error=str(e)
             )
 
+    async def resolve_commit_sha(self) -> str | None:
+        headers = self._create_headers()
+        repo_url = f"https://api.bitbucket.org/2.0/repositories/{self.request.repo_owner}/{self.request.repo_name}"
+        try:
+            resp = await self.client.get(repo_url, headers=headers)
+            if resp.status_code != 200:
+                logger.warning(f"Could not resolve commit SHA: {resp.status_code}")
+                return None
+            branch = resp.json().get("mainbranch", {}).get("name", "master")
+
+            resp = await self.client.get(
+                f"{repo_url}/refs/branches/{branch}", headers=headers
+            )
+            if resp.status_code == 200:
+                return resp.json().get("target", {}).get("hash")
+            logger.warning(f"Could not resolve commit SHA: {resp.status_code}")
+        except Exception as e:
+            logger.warning(f"Could not resolve commit SHA: {e}")
+        return None
+
     async def fetch_file_content(self, file_path: str) -> str | None:
         """[Added] Fetch file content"""
         headers = self._create_headers()
@@ -97,14 +122,6 @@ class BitbucketProvider(RepositoryProvider):
         url = f"https://api.bitbucket.org/2.0/repositories/{workspace}/{repo_slug}/src/{branch}/{file_path}"
 
         try:
-            resp = await self.client.get(url, headers=headers)
-            if resp.status_code == 200:
-                return resp.text
-
-            logger.warning(
-                f"Bitbucket fetch failed for {file_path}: {resp.status_code}"
-            )
-            return None
-        except Exception as e:
-            logger.error(f"Bitbucket file fetch error: {e}")
-            return None
+            return await self._stream_file_content(url, headers, file_path)
+        except httpx.HTTPError as e:
+            raise FileFetchError(f"Bitbucket file fetch error: {e}") from e
@@ -2,17 +2,34 @@
 GitHub-specific repository provider implementation using GitHub REST API.
 """
 
+import asyncio
 import base64
+import tarfile
+import tempfile
+from typing import IO
 
+import httpx
 from loguru import logger
 
 from src.core.config import settings
 from src.models.wiki_schema import RepositoryStructure
-from src.providers.base import RepositoryProvider
-from src.utils.file_filter import should_ignore
+from src.providers.base import FileFetchError, RepositoryProvider
+from src.services.page_manifest import manifest_repo_path
+from src.utils.file_content import text_from_bytes
+from src.utils.file_filter import compile_ignore_patterns
 
 
 class GitHubProvider(RepositoryProvider):
+    def __init__(self, request):
+        super().__init__(request)
+        self.default_branch: str | None = None
+        # Populated in archive mode: repository-relative path -> raw file bytes.
+        self._archive_files: dict[str, bytes] | None = None
+        self._archive_attempted = False
+        self._archive_lock = asyncio.Lock()
+        # Blob sizes from the tree listing, checked before fetching a file
+        self._file_sizes: dict[str, int] = {}
+
     def _create_headers(self) -> dict[str, str]:
         headers = {
             "Accept": "application/vnd.github.v3+json",
@@ -41,6 +58,11 @@ class GitHubProvider(RepositoryProvider):
 
             if resp.status_code == 200:
                 default_branch = resp.json().get("default_branch", "main")
+            self.default_branch = default_branch
+
+            # (Optional) Download the whole repository once instead of per-file calls
+            if settings.GITHUB_ARCHIVE_MODE:
+                await self._ensure_archive()
 
             # 2. Fetch file tree (Recursive)
             tree_url = f"{base_url}/repos/{owner}/{repo}/git/trees/{default_branch}?recursive=1"
@@ -48,13 +70,17 @@ class GitHubProvider(RepositoryProvider):
 
             if resp.status_code == 200:
                 tree_data = resp.json()
-                paths = [
-                    item["path"]
+                ignored = compile_ignore_patterns(settings.IGNORED_PATTERNS)
+                manifest = manifest_repo_path()
+                blobs = [
+                    item
                     for item in tree_data.get("tree", [])
                     if item["type"] == "blob"
-                    and not should_ignore(item["path"], settings.IGNORED_PATTERNS)
+                    and item["path"] != manifest
+                    and not ignored.matches(item["path"])
                 ]
-                file_tree = "\n".join(paths)
+                self._file_sizes = {item["path"]: item.get("size", 0) for item in blobs}
+                file_tree = "\n".join(item["path"] for item in blobs)
             else:
                 logger.error(f"Failed to fetch tree: {resp.text}")
 
@@ -85,27 +111,127 @@ class GitHubProvider(RepositoryProvider):
                 file_tree="", readme="", default_branch=default_branch, error=str(e)
             )
 
+    async def resolve_commit_sha(self) -> str | None:
+        owner, repo = self.request.repo_owner, self.request.repo_name
+        # "HEAD" resolves to the default branch; the sha media type returns it as text
+        url = f"{self._get_api_base()}/repos/{owner}/{repo}/commits/HEAD"
+        headers = {**self._create_headers(), "Accept": "application/vnd.github.sha"}
+        try:
+            resp = await self.client.get(url, headers=headers)
+            if resp.status_code == 200:
+                return resp.text.strip()
+            logger.warning(f"Could not resolve commit SHA: {resp.status_code}")
+        except Exception as e:
+            logger.warning(f"Could not resolve commit SHA: {e}")
+        return None
+
+    async def _ensure_archive(self) -> None:
+        """Downloads the archive at most once, even under concurrent callers."""
+        async with self._archive_lock:
+            if self._archive_attempted:
+                return
+            self._archive_attempted = True
+            await self._load_archive(self.default_branch)
+
+    async def _load_archive(self, ref: str | None) -> None:
+        """
+        Streams the repository tarball for `ref` (default branch if None) into a
+        spooled temp file and indexes every non-ignored file in memory.
+        On failure, falls back to per-file `/contents` requests.
+        """
+        owner, repo = self.request.repo_owner, self.request.repo_name
+        url = f"{self._get_api_base()}/repos/{owner}/{repo}/tarball"
+        if ref:
+            url = f"{url}/{ref}"
+
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as buffer:
+                async with self.client.stream(
+                    "GET", url, headers=self._create_headers(), follow_redirects=True
+                ) as resp:
+                    if resp.status_code != 200:
+                        logger.warning(
+                            f"Archive download failed ({resp.status_code}); "
+                            "falling back to per-file requests."
+                        )
+                        return
+                    async for chunk in resp.aiter_bytes():
+                        buffer.write(chunk)
+
+                buffer.seek(0)
+                self._archive_files = await asyncio.to_thread(
+                    self._index_archive, buffer
+                )
+            logger.info(
+                f"Indexed {len(self._archive_files)} files from the "
+                f"{ref or 'default branch'} archive."
+            )
+        except Exception as e:
+            logger.warning(f"Archive download failed ({e}); using per-file requests.")
+            self._archive_files = None
+
+    @staticmethod
+    def _index_archive(fileobj: IO[bytes]) -> dict[str, bytes]:
+        """[Synchronous Function] Extracts regular files from a GitHub tarball."""
+        files: dict[str, bytes] = {}
+        ignored = compile_ignore_patterns(settings.IGNORED_PATTERNS)
+        with tarfile.open(fileobj=fileobj, mode="r:gz") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                # GitHub prefixes every entry with "{owner}-{repo}-{sha}/".
+                _, _, path = member.name.partition("/")
+                if not path or ignored.matches(path):
+                    continue
+                extracted = tar.extractfile(member)
+                if extracted:
+                    files[path] = extracted.read()
+        return files
+
     async def fetch_file_content(self, file_path: str) -> str | None:
+        if settings.GITHUB_ARCHIVE_MODE:
+            await self._ensure_archive()
+        if self._archive_files is not None:
+            return self._read_from_archive(file_path)
+
         github_api_base = self._get_api_base()
         headers = self._create_headers()
 
         api_url = f"{github_api_base}/repos/{self.request.repo_owner}/{self.request.repo_name}/contents/{file_path}"
 
         try:
+            if self._file_sizes.get(file_path, 0) > settings.MAX_FILE_BYTES:
+                # The JSON contents API omits files over 1 MB; stream the raw
+                # content instead and keep only an excerpt.
+                raw_headers = {**headers, "Accept": "application/vnd.github.raw"}
+                return await self._stream_file_content(api_url, raw_headers, file_path)
+
             response = await self.client.get(api_url, headers=headers)
+        except httpx.HTTPError as e:
+            raise FileFetchError(f"Error fetching file '{file_path}': {e}") from e
 
-            if response.status_code == 200:
-                file_data = response.json()
-                if "content" in file_data:
-                    encoded_content = file_data["content"]
-                    return base64.b64decode(encoded_content).decode("utf-8")
+        if response.status_code == 200:
+            file_data = response.json()
+            if "content" in file_data:
+                encoded_content = file_data["content"]
+                return text_from_bytes(base64.b64decode(encoded_content), file_path)
 
-                logger.warning(f"No content found for '{file_path}'")
-                return None
-            logger.warning(
-                f"Could not fetch file '{file_path}'. Status: {response.status_code}"
-            )
+            logger.warning(f"No content found for '{file_path}'")
             return None
-        except Exception as e:
-            logger.error(f"Error fetching file '{file_path}': {e}")
+        if response.status_code == 404:
+            logger.warning(f"File '{file_path}' not found")
             return None
+        raise FileFetchError(
+            f"Could not fetch file '{file_path}'. Status: {response.status_code}"
+        )
+
+    def _read_from_archive(self, file_path: str) -> str | None:
+        data = self._archive_files.get(file_path) if self._archive_files else None
+        if data is None:
+            logger.warning(f"File '{file_path}' not found in repository archive")
+            return None
+        return text_from_bytes(data, file_path)
+
+    async def close(self):
+        self._archive_files = None
+        await super().close()
@@ -4,12 +4,14 @@ GitLab-specific repository provider implementation supporting self-hosted instan
 
 from urllib.parse import quote, urlparse
 
+import httpx
 from loguru import logger
 
 from src.core.config import settings
 from src.models.wiki_schema import RepositoryStructure
-from src.providers.base import RepositoryProvider
-from src.utils.file_filter import should_ignore
+from src.providers.base import FileFetchError, RepositoryProvider
+from src.services.page_manifest import manifest_repo_path
+from src.utils.file_filter import compile_ignore_patterns
 
 
 class GitLabProvider(RepositoryProvider):
@@ -43,6 +45,8 @@ class GitLabProvider(RepositoryProvider):
 
         default_branch = "main"
         file_list = []
+        ignored = compile_ignore_patterns(settings.IGNORED_PATTERNS)
+        manifest = manifest_repo_path()
         readme_content = ""
 
         try:
@@ -76,7 +80,8 @@ class GitLabProvider(RepositoryProvider):
                         item["path"]
                         for item in items
                         if item["type"] == "blob"
-                        and not should_ignore(item["path"], settings.IGNORED_PATTERNS)
+                        and item["path"] != manifest
+                        and not ignored.matches(item["path"])
                     ]
                 )
 
@@ -103,6 +108,27 @@ class GitLabProvider(RepositoryProvider):
                 file_tree="", readme="", default_branch="main", error=str(e)
             )
 
+    async def resolve_commit_sha(self) -> str | None:
+        base_url = self._get_api_base()
+        project_url = f"{base_url}/projects/{self._get_encoded_project_path()}"
+        headers = self._create_headers()
+        try:
+            resp = await self.client.get(project_url, headers=headers)
+            if resp.status_code != 200:
+                logger.warning(f"Could not resolve commit SHA: {resp.status_code}")
+                return None
+            branch = quote(resp.json().get("default_branch", "main"), safe="")
+
+            resp = await self.client.get(
+                f"{project_url}/repository/commits/{branch}", headers=headers
+            )
+            if resp.status_code == 200:
+                return resp.json().get("id")
+            logger.warning(f"Could not resolve commit SHA: {resp.status_code}")
+        except Exception as e:
+            logger.warning(f"Could not resolve commit SHA: {e}")
+        return None
+
     async def fetch_file_content(self, file_path: str) -> str | None:
         """[Added] Fetch file content"""
         base_url = self._get_api_base()
@@ -120,12 +146,6 @@ class GitLabProvider(RepositoryProvider):
 
         try:
             # Add ?ref=main or similar if the ref parameter is needed
-            resp = await self.client.get(url, headers=headers)
-            if resp.status_code == 200:
-                return resp.text
-
-            logger.warning(f"GitLab fetch failed for {file_path}: {resp.status_code}")
-            return None
-        except Exception as e:
-            logger.error(f"GitLab file fetch error: {e}")
-            return None
+            return await self._stream_file_content(url, headers, file_path)
+        except httpx.HTTPError as e:
+            raise FileFetchError(f"GitLab file fetch error: {e}") from e
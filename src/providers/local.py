@@ -4,6 +4,8 @@ Local filesystem repository provider implementation.
 
 import asyncio
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from loguru import logger
@@ -11,7 +13,10 @@ from loguru import logger
 from src.core.config import settings
 from src.models.wiki_schema import RepositoryStructure
 from src.providers.base import RepositoryProvider
-from src.utils.file_filter import should_ignore
+from src.services.page_manifest import manifest_repo_path
+from src.utils.file_content import read_text_file
+from src.utils.file_filter import IgnoreMatcher, compile_ignore_patterns
+from src.utils.gitignore import GitIgnore
 
 
 class LocalProvider(RepositoryProvider):
@@ -22,37 +27,44 @@ class LocalProvider(RepositoryProvider):
     async def close(self):
         pass
 
-    def _scan_disk_sync(self, local_path: str) -> tuple[str, str, str]:
+    def _scan_disk_sync(self, local_path: str) -> RepositoryStructure:
         """[Synchronous Function] Performs disk scan (executed in a separate thread)."""
         repo_path = Path(local_path)
         if not repo_path.is_dir():
             raise FileNotFoundError(f"Local path does not exist: {local_path}")
 
-        file_tree_list = []
         readme_content = ""
+        ignored = compile_ignore_patterns(settings.IGNORED_PATTERNS)
 
         try:
-            for root, dirs, files in os.walk(repo_path):
-                # Calculate relative path for filtering
-                rel_root = Path(root).relative_to(repo_path)
-
-                # Pruning: In-place modification of the directories list.
-                # Filter out ignored directories
-                dirs[:] = [
-                    d
-                    for d in dirs
-                    if not should_ignore(str(rel_root / d), settings.IGNORED_PATTERNS)
+            # git always hides ignored untracked files, so it can only stand in
+            # for the walk when .gitignore files are respected.
+            listing = (
+                self._list_git_files_sync(local_path)
+                if settings.LOCAL_GIT_INDEX_SCAN and settings.RESPECT_GITIGNORE
+                else None
+            )
+            if listing is not None:
+                file_tree_list, file_hashes = listing
+                # Like the walk, drop tracked files that .gitignore excludes
+                # (e.g. force-added build outputs): either way, the tree lists
+                # exactly the files .gitignore does not exclude.
+                gitignore = GitIgnore(local_path)
+                file_tree_list = [
+                    p
+                    for p in file_tree_list
+                    if not ignored.matches(p) and not gitignore.excludes(p)
                 ]
+                file_hashes = {
+                    p: file_hashes[p] for p in file_tree_list if p in file_hashes
+                }
+            else:
+                file_tree_list = self._walk_disk_sync(repo_path, ignored)
+                file_hashes = {}
 
-                for file in files:
-                    file_path = Path(root) / file
-                    relative_path = str(file_path.relative_to(repo_path))
-
-                    if should_ignore(relative_path, settings.IGNORED_PATTERNS):
-                        continue
-
-                    # Convert Windows paths (\) to POSIX (/) for consistency.
-                    file_tree_list.append(relative_path.replace("\\", "/"))
+            manifest = manifest_repo_path(local_path)
+            file_tree_list = [p for p in file_tree_list if p != manifest]
+            file_hashes.pop(manifest, None)
 
             # Find README (requires additional logic for case-insensitivity, but typically README.md).
             readme_path = repo_path / "README.md"
@@ -61,12 +73,170 @@ class LocalProvider(RepositoryProvider):
                     encoding="utf-8", errors="ignore"
                 )
 
-            return "\n".join(sorted(file_tree_list)), readme_content, "main"
+            return RepositoryStructure(
+                file_tree="\n".join(sorted(file_tree_list)),
+                readme=readme_content,
+                default_branch="main",
+                file_hashes=file_hashes,
+            )
 
         except Exception as e:
             logger.error(f"Error scanning local disk: {e}")
             raise
 
+    @staticmethod
+    def _walk_disk_sync(repo_path: Path, ignored: IgnoreMatcher) -> list[str]:
+        """
+        [Synchronous Function] Lists files by scanning the directory tree.
+
+        Each top-level directory is scanned by its own thread-pool task (the
+        scan mostly waits on the filesystem); the results are merged in
+        directory order, so the listing does not depend on thread timing.
+        """
+        root = str(repo_path)
+        gitignore = GitIgnore(root) if settings.RESPECT_GITIGNORE else None
+
+        def is_ignored(relative_path: str, is_dir: bool) -> bool:
+            return ignored.matches(relative_path) or (
+                gitignore is not None and gitignore.is_ignored(relative_path, is_dir)
+            )
+
+        def scan_dir(rel_dir: str) -> tuple[list[str], list[str]]:
+            """Files and not ignored subdirectories directly inside `rel_dir`."""
+            files: list[str] = []
+            dirs: list[str] = []
+            prefix = rel_dir + "/" if rel_dir else ""
+            try:
+                with os.scandir(os.path.join(root, rel_dir)) as it:
+                    entries = list(it)
+            except OSError:
+                # Unreadable directory (os.walk skipped these silently as well)
+                return files, dirs
+
+            for entry in entries:
+                relative_path = prefix + entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                # Pruning: ignored directories are never scanned.
+                if is_ignored(relative_path, is_dir):
+                    continue
+                if not is_dir:
+                    files.append(relative_path)
+                elif not entry.is_symlink():
+                    dirs.append(relative_path)
+            dirs.sort()
+            return files, dirs
+
+        def scan_tree(rel_dir: str) -> list[str]:
+            files: list[str] = []
+            pending = [rel_dir]
+            while pending:
+                dir_files, subdirs = scan_dir(pending.pop())
+                files.extend(dir_files)
+                pending.extend(reversed(subdirs))
+            return files
+
+        file_tree_list, top_dirs = scan_dir("")
+        if top_dirs:
+            with ThreadPoolExecutor(max_workers=settings.LOCAL_SCAN_WORKERS) as pool:
+                for files in pool.map(scan_tree, top_dirs):
+                    file_tree_list.extend(files)
+        return file_tree_list
+
+    @staticmethod
+    def _list_git_files_sync(
+        local_path: str,
+    ) -> tuple[list[str], dict[str, str]] | None:
+        """
+        [Synchronous Function] Lists files from the git index instead of walking
+        the disk: tracked files plus untracked ones that are not ignored.
+
+        Returns the paths and the blob SHA of every file whose working copy
+        matches the index, or None if `local_path` is not inside a git
+        work tree (or git is unavailable).
+        """
+        try:
+            index = subprocess.run(
+                [
+                    "git",
+                    "-C",
+                    local_path,
+                    # Never run an fsmonitor hook configured by the repository
+                    "-c",
+                    "core.fsmonitor=false",
+                    "ls-files",
+                    "--stage",
+                    "-z",
+                ],
+                capture_output=True,
+                timeout=120,
+            )
+            if index.returncode != 0:
+                return None
+            status = subprocess.run(
+                [
+                    "git",
+                    "-C",
+                    local_path,
+                    # Do not refresh the index (the checkout may be mounted read-only)
+                    "--no-optional-locks",
+                    "-c",
+                    "core.fsmonitor=false",
+                    "-c",
+                    "status.relativePaths=true",
+                    "status",
+                    "--porcelain=v1",
+                    "-z",
+                    "--untracked-files=all",
+                    "--",
+                    ".",
+                ],
+                capture_output=True,
+                timeout=120,
+            )
+            if status.returncode != 0:
+                return None
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"git listing unavailable for {local_path}: {e}")
+            return None
+
+        file_hashes: dict[str, str] = {}
+        for entry in index.stdout.decode("utf-8", "surrogateescape").split("\0"):
+            if not entry:
+                continue
+            # "<mode> <sha> <stage>\t<path>"
+            info, _, path = entry.partition("\t")
+            mode, sha, _ = info.split(" ", 2)
+            if mode == "160000":
+                # Submodule (gitlink), not a file of this repository
+                continue
+            file_hashes[path] = sha
+
+        paths = dict.fromkeys(file_hashes)
+        entries = iter(status.stdout.decode("utf-8", "surrogateescape").split("\0"))
+        for entry in entries:
+            if len(entry) < 4:
+                continue
+            code, path = entry[:2], entry[3:]
+            if code[0] in "RC":
+                # Renames and copies are followed by the original path.
+                next(entries, None)
+            if path.endswith("/") or path.startswith("../"):
+                # Nested repositories, or paths outside of `local_path`
+                continue
+            if code == "??":
+                paths[path] = None
+            elif code[1] == "D":
+                paths.pop(path, None)
+                file_hashes.pop(path, None)
+            elif code[1] != " ":
+                # Modified in the working copy: the index SHA is stale.
+                file_hashes.pop(path, None)
+
+        return list(paths), file_hashes
+
     async def fetch_structure(self) -> RepositoryStructure:
         if not self.request.local_path:
             return RepositoryStructure(
@@ -78,18 +248,56 @@ class LocalProvider(RepositoryProvider):
 
         try:
             # Offload CPU/Disk-bound tasks to a ThreadPool.
-            file_tree, readme, branch = await asyncio.to_thread(
+            return await asyncio.to_thread(
                 self._scan_disk_sync, self.request.local_path
             )
-
-            return RepositoryStructure(
-                file_tree=file_tree, readme=readme, default_branch=branch
-            )
         except Exception as e:
             return RepositoryStructure(
                 file_tree="", readme="", default_branch="main", error=str(e)
             )
 
+    async def resolve_commit_sha(self) -> str | None:
+        """
+        Returns HEAD of the local git checkout, or None if it is not a git
+        repository or has uncommitted changes (HEAD would not describe the files).
+        """
+        if not self.request.local_path:
+            return None
+        return await asyncio.to_thread(self._git_head_sync, self.request.local_path)
+
+    @staticmethod
+    def _git_head_sync(local_path: str) -> str | None:
+        """[Synchronous Function] Runs git to read HEAD and the worktree state."""
+        try:
+            # As for the index scan: no repository fsmonitor hook, no index lock
+            git = [
+                "git",
+                "-C",
+                local_path,
+                "--no-optional-locks",
+                "-c",
+                "core.fsmonitor=false",
+            ]
+            head = subprocess.run(
+                [*git, "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+            if head.returncode != 0:
+                return None
+            status = subprocess.run(
+                [*git, "status", "--porcelain"],
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+            if status.returncode != 0 or status.stdout.strip():
+                return None
+            return head.stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+
     async def fetch_file_content(self, file_path: str) -> str | None:
         if not self.request.local_path:
             return None
@@ -98,9 +306,7 @@ class LocalProvider(RepositoryProvider):
             full_path = Path(self.request.local_path) / file_path
 
             if full_path.is_file():
-                return await asyncio.to_thread(
-                    full_path.read_text, encoding="utf-8", errors="ignore"
-                )
+                return await asyncio.to_thread(read_text_file, full_path, file_path)
 
             logger.warning(f"Local file not found: {full_path}")
             return None
@@ -6,16 +6,35 @@ from src.core.logger_config import setup_logging
 
 setup_logging()
 
+import asyncio
+import contextlib
+
 import uvicorn
 from fastapi import FastAPI
 from loguru import logger
 
 from src.api.v1.endpoints import webhook, wiki
+from src.core.config import settings
+from src.services.task_store import run_task_sweeper
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Evict expired / excess tasks in the background for the server's lifetime
+    sweeper = asyncio.create_task(
+        run_task_sweeper(settings.TASK_SWEEP_INTERVAL_SECONDS)
+    )
+    yield
+    sweeper.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await sweeper
+
 
 app = FastAPI(
     title="Wiki as Readme",
     description="Turn your codebase into a comprehensive Wiki in minutes, delivered in a single Readme.",
     version="1.5.0",
+    lifespan=lifespan,
 )
 
 
@@ -0,0 +1,58 @@
+"""src.services.active_tasks
+In-process registry of running wiki generation tasks and their live state.
+"""
+
+import asyncio
+
+from src.services.structure_analyzer import WikiStructureDeterminer
+from src.services.task_store import TaskId
+
+# Determiners of tasks currently running in this process.
+# NOTE: Live state is per-process; with multiple workers, a task is only
+# visible here in the worker that runs it.
+_determiners: dict[TaskId, WikiStructureDeterminer] = {}
+# Generation runs of tasks in this process, kept so they can be cancelled.
+_runs: dict[TaskId, asyncio.Task] = {}
+# Tasks whose run was cancelled on request (as opposed to by a shutdown).
+_cancel_requested: set[TaskId] = set()
+
+
+def register_determiner(task_id: TaskId, determiner: WikiStructureDeterminer):
+    """Makes a running task's determiner available for live inspection."""
+    _determiners[task_id] = determiner
+
+
+def unregister_determiner(task_id: TaskId):
+    _determiners.pop(task_id, None)
+
+
+def get_determiner(task_id: TaskId) -> WikiStructureDeterminer | None:
+    """Returns the determiner of a task running in this process, if any."""
+    return _determiners.get(task_id)
+
+
+def register_run(task_id: TaskId, run: asyncio.Task):
+    """Makes a running task's generation cancellable."""
+    _runs[task_id] = run
+
+
+def unregister_run(task_id: TaskId):
+    _runs.pop(task_id, None)
+    _cancel_requested.discard(task_id)
+
+
+def request_cancel(task_id: TaskId) -> asyncio.Task | None:
+    """
+    Cancels the generation run of a task running in this process on behalf of
+    the user. Returns the run, or None if the task is not running here.
+    """
+    run = _runs.get(task_id)
+    if run:
+        _cancel_requested.add(task_id)
+        run.cancel()
+    return run
+
+
+def cancel_requested(task_id: TaskId) -> bool:
+    """True if the task's run was cancelled through `request_cancel`."""
+    return task_id in _cancel_requested
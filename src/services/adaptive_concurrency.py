@@ -0,0 +1,149 @@
+"""src.services.adaptive_concurrency
+AIMD (additive-increase / multiplicative-decrease) concurrency limiter for LLM calls.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator
+
+from loguru import logger
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Drop-in replacement for `asyncio.Semaphore` whose limit adapts to the provider.
+
+    - Additive increase: every healthy response grows the limit by `1 / limit`,
+      i.e. roughly +1 slot per window of `limit` successful calls.
+    - Multiplicative decrease: a 429, timeout or latency spike (latency above
+      `latency_spike_factor` x the moving baseline) halves the limit.
+
+    Only one decrease is applied per congestion event: failures of calls that
+    started before the last decrease are ignored, since they were sent under
+    the old limit.
+
+    Waiting callers are served lowest `priority` first (FIFO among equals).
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int | None = None,
+        latency_spike_factor: float = 3.0,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit or initial_limit)
+        self.latency_spike_factor = latency_spike_factor
+
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiters: list[tuple[tuple, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+
+        self._baseline_latency: float | None = None  # EWMA of healthy latencies
+        self._last_decrease = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def baseline_latency(self) -> float | None:
+        return self._baseline_latency
+
+    async def acquire(self, priority: tuple = ()) -> None:
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted right before cancellation; hand it back.
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: tuple = ()) -> AsyncIterator[None]:
+        """Like `async with limiter`, but waits in line by `priority`."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_success(self, started_at: float) -> None:
+        """Feeds a successful call (started at `time.monotonic()` value) back."""
+        latency = time.monotonic() - started_at
+
+        baseline = self._baseline_latency
+        if baseline is None:
+            self._baseline_latency = latency
+        else:
+            # Spikes are folded into the baseline as well: otherwise a baseline
+            # seeded by a short call would flag every later (longer) call and
+            # ratchet the limit down to `min_limit` for good.
+            self._baseline_latency = 0.8 * baseline + 0.2 * latency
+            if latency > baseline * self.latency_spike_factor:
+                # At most one decrease per window, as for overloads
+                self._decrease(
+                    started_at, f"latency spike ({latency:.1f}s vs {baseline:.1f}s)"
+                )
+                return
+
+        if self._limit < self.max_limit:
+            previous = self.limit
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            if self.limit != previous:
+                logger.debug(f"Concurrency limit increased to {self.limit}")
+                self._wake_waiters()
+
+    def record_overload(self, started_at: float, reason: str = "overload") -> None:
+        """Feeds a rate-limit (429) or timeout failure back."""
+        self._decrease(started_at, reason)
+
+    def _decrease(self, started_at: float, reason: str) -> None:
+        if started_at < self._last_decrease:
+            return
+
+        self._last_decrease = time.monotonic()
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit / 2)
+        if self.limit != previous:
+            logger.warning(
+                f"Concurrency limit decreased {previous} -> {self.limit} ({reason})"
+            )
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
@@ -0,0 +1,179 @@
+"""src.services.job_queue
+SQLite-backed queue of wiki generation jobs, consumed by the worker pool (src.worker).
+"""
+
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from src.core.config import settings
+from src.models.api_schema import WikiGenerationRequest
+from src.services.task_store import TaskId
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds `max_pending` queued jobs."""
+
+
+class Job(BaseModel):
+    job_id: str
+    task_id: TaskId
+    request: WikiGenerationRequest
+    save_file: bool = False
+
+
+class JobQueue:
+    """
+    FIFO job queue shared by the API processes (producers) and the worker
+    processes (consumers). Jobs are removed once a worker finishes them; the
+    outcome itself is recorded in the task store.
+    """
+
+    def __init__(self, path: str | Path, max_pending: int):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_pending = max_pending
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT UNIQUE NOT NULL,
+                task_id TEXT NOT NULL,
+                request TEXT NOT NULL,
+                save_file INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                worker TEXT,
+                enqueued_at REAL NOT NULL,
+                started_at REAL
+            )
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def pending_count(self) -> int:
+        return (
+            self._connection()
+            .execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'")
+            .fetchone()[0]
+        )
+
+    def is_full(self) -> bool:
+        return self.pending_count() >= self.max_pending
+
+    def enqueue(
+        self, task_id: TaskId, request: WikiGenerationRequest, save_file: bool
+    ) -> Job:
+        """Adds a job; raises QueueFullError instead of growing past `max_pending`."""
+        job = Job(
+            job_id=str(uuid.uuid4()),
+            task_id=task_id,
+            request=request,
+            save_file=save_file,
+        )
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({pending} jobs waiting).")
+            conn.execute(
+                "INSERT INTO jobs (job_id, task_id, request, save_file, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    job.job_id,
+                    task_id,
+                    request.model_dump_json(),
+                    int(save_file),
+                    time.time(),
+                ),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job
+
+    def claim(self, worker: str) -> Job | None:
+        """Atomically takes the oldest queued job, or returns None if there is none."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT job_id, task_id, request, save_file FROM jobs "
+                "WHERE status = 'queued' ORDER BY seq LIMIT 1"
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, started_at = ? "
+                    "WHERE job_id = ?",
+                    (worker, time.time(), row[0]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        job_id, task_id, request_json, save_file = row
+        return Job(
+            job_id=job_id,
+            task_id=task_id,
+            request=WikiGenerationRequest.model_validate_json(request_json),
+            save_file=bool(save_file),
+        )
+
+    def finish(self, job_id: str) -> None:
+        self._connection().execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def release_worker(self, worker: str) -> list[TaskId]:
+        """Drops the running jobs of a dead worker and returns their task IDs."""
+        conn = self._connection()
+        task_ids = [
+            row[0]
+            for row in conn.execute(
+                "SELECT task_id FROM jobs WHERE status = 'running' AND worker = ?",
+                (worker,),
+            )
+        ]
+        conn.execute(
+            "DELETE FROM jobs WHERE status = 'running' AND worker = ?", (worker,)
+        )
+        return task_ids
+
+    def requeue_running(self) -> int:
+        """Puts jobs left running by a previous (crashed) pool back in the queue."""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL "
+            "WHERE status = 'running'"
+        )
+        return cursor.rowcount
+
+
+_queue: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue:
+    """Returns the configured job queue (created on first use)."""
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(settings.JOB_QUEUE_PATH, settings.JOB_QUEUE_MAX_PENDING)
+    return _queue
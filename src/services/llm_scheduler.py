@@ -0,0 +1,183 @@
+"""src.services.llm_scheduler
+Process-wide admission control for LLM calls across concurrent wiki tasks.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+from collections.abc import AsyncIterator
+from typing import Literal
+
+from loguru import logger
+
+from src.core.config import settings
+from src.models.api_schema import LLMSchedulerStatus, LLMTaskShareStatus
+from src.services.adaptive_concurrency import AdaptiveConcurrencyLimiter
+
+SchedulerPolicy = Literal["fair", "fifo"]
+
+
+class TaskShare:
+    """
+    One task's share of the scheduler. Used like a semaphore around each LLM
+    call of the task: `async with share: ...`, or `async with share.slot(p)` to
+    serve the task's own waiting calls lowest priority `p` first.
+    """
+
+    def __init__(
+        self,
+        scheduler: "LLMScheduler",
+        weight: float = 1.0,
+        limiter: AdaptiveConcurrencyLimiter | None = None,
+    ):
+        self.scheduler = scheduler
+        self.weight = max(weight, 0.01)
+        # The task's own (AIMD) limiter, reported as its per-task limit
+        self.limiter = limiter
+        self.task_id: str | None = None
+        self.in_flight = 0
+        self.granted = 0
+        self._waiters: list[tuple[tuple, int, asyncio.Future[None]]] = []
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: tuple = ()) -> None:
+        await self.scheduler._acquire(self, priority)
+
+    def release(self) -> None:
+        self.scheduler._release(self)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: tuple = ()) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class LLMScheduler:
+    """
+    Grants at most `global_limit` LLM calls in flight across all tasks of this
+    process. Each task still applies its own limit first (its adaptive limiter);
+    the scheduler only decides which task gets the next free global slot.
+
+    - "fair": the waiting task with the fewest calls in flight relative to its
+      weight goes first, so a huge repository cannot starve small ones.
+    - "fifo": slots are granted in request order, regardless of the task.
+    """
+
+    def __init__(self, global_limit: int, policy: SchedulerPolicy = "fair"):
+        self.global_limit = max(1, global_limit)
+        self.policy = policy
+        self.in_flight = 0
+        self._shares: set[TaskShare] = set()
+        self._sequence = itertools.count()
+
+    def register(
+        self, weight: float = 1.0, limiter: AdaptiveConcurrencyLimiter | None = None
+    ) -> TaskShare:
+        share = TaskShare(self, weight=weight, limiter=limiter)
+        self._shares.add(share)
+        return share
+
+    def unregister(self, share: TaskShare) -> None:
+        self._shares.discard(share)
+
+    async def _acquire(self, share: TaskShare, priority: tuple) -> None:
+        if self.in_flight < self.global_limit and not self._has_waiters():
+            self._grant(share)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), future)
+        heapq.heappush(share._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted right before cancellation; hand it back.
+                self._release(share)
+            elif entry in share._waiters:
+                share._waiters.remove(entry)
+                heapq.heapify(share._waiters)
+            raise
+
+    def _release(self, share: TaskShare) -> None:
+        share.in_flight -= 1
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _grant(self, share: TaskShare) -> None:
+        share.in_flight += 1
+        share.granted += 1
+        self.in_flight += 1
+
+    def _has_waiters(self) -> bool:
+        return any(share._waiters for share in self._shares)
+
+    def _next_share(self) -> TaskShare | None:
+        waiting = [share for share in self._shares if share._waiters]
+        if not waiting:
+            return None
+        if self.policy == "fifo":
+            return min(waiting, key=lambda s: s._waiters[0][1])
+        return min(waiting, key=lambda s: (s.in_flight / s.weight, s._waiters[0][1]))
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.global_limit:
+            share = self._next_share()
+            if share is None:
+                return
+            _, _, future = heapq.heappop(share._waiters)
+            if not future.done():
+                self._grant(share)
+                future.set_result(None)
+
+    def snapshot(self) -> LLMSchedulerStatus:
+        """Current limits, slots in flight and waiting calls per task."""
+        tasks = [
+            LLMTaskShareStatus(
+                task_id=share.task_id,
+                weight=share.weight,
+                limit=share.limiter.limit if share.limiter else None,
+                in_flight=share.in_flight,
+                waiting=share.waiting,
+                granted=share.granted,
+            )
+            for share in self._shares
+        ]
+        return LLMSchedulerStatus(
+            policy=self.policy,
+            global_limit=self.global_limit,
+            in_flight=self.in_flight,
+            waiting=sum(task.waiting for task in tasks),
+            tasks=tasks,
+        )
+
+
+_scheduler: LLMScheduler | None = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Returns the scheduler shared by every task in this process."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler(
+            settings.global_max_concurrency, settings.llm_scheduler_policy
+        )
+        logger.info(
+            f"LLM scheduler: {_scheduler.global_limit} global slots "
+            f"({_scheduler.policy} policy)"
+        )
+    return _scheduler
@@ -0,0 +1,157 @@
+"""src.services.page_manifest
+Manifest of per-page input fingerprints for incremental wiki regeneration.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from src.core.config import settings
+from src.models.wiki_schema import WikiStructure
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output_path: str | Path) -> Path:
+    """Path of the manifest kept next to a wiki output file."""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.name}.manifest.json")
+
+
+def manifest_repo_path(repo_root: str | Path = ".") -> str | None:
+    """
+    Path of the manifest of WIKI_OUTPUT_PATH relative to `repo_root` ('/'
+    separated), or None if it lies outside. Providers leave it out of the file
+    tree: it is written by the generation, not part of the sources.
+    """
+    path = manifest_path(settings.WIKI_OUTPUT_PATH).resolve()
+    try:
+        return path.relative_to(Path(repo_root).resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+class PageManifest:
+    """
+    Records, for each generated page, a fingerprint of everything that went into
+    its prompt (model, prompt template, page title, file paths and file contents)
+    together with the generated markdown.
+
+    On the next run, pages whose fingerprint is unchanged are reused as-is and the
+    LLM is only called for pages whose inputs changed. The wiki structure is
+    tracked the same way, so an unchanged file tree keeps stable page IDs.
+    """
+
+    def __init__(self, path: str | Path, data: dict[str, Any] | None = None):
+        self.path = Path(path)
+        data = data or {}
+        self._previous_structure: dict[str, Any] | None = data.get("structure")
+        self._previous_pages: dict[str, dict[str, str]] = data.get("pages", {})
+
+        # Only entries touched during the current run are persisted.
+        self._structure: dict[str, Any] | None = None
+        self._pages: dict[str, dict[str, str]] = {}
+        self.reused_pages: int = 0
+
+    @classmethod
+    def for_output(cls, output_path: str | Path) -> "PageManifest":
+        """Loads the manifest stored next to the given wiki output file."""
+        return cls.load(manifest_path(output_path))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "PageManifest":
+        """Loads a manifest from disk. A missing or incompatible file yields an empty one."""
+        path = Path(path)
+        if not path.is_file():
+            return cls(path)
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+            return cls(path)
+
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info(f"Manifest version mismatch in {path}; starting fresh.")
+            return cls(path)
+
+        return cls(path, data)
+
+    @staticmethod
+    def fingerprint(model_name: str, rendered_prompt: str) -> str:
+        """
+        Hashes the model together with the fully rendered prompt, which already
+        embeds the template, page title, file paths and file contents.
+        """
+        digest = hashlib.sha256()
+        digest.update(model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(rendered_prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup_structure(self, fingerprint: str) -> WikiStructure | None:
+        """Returns the previous wiki structure if its inputs are unchanged."""
+        previous = self._previous_structure
+        if not previous or previous.get("fingerprint") != fingerprint:
+            return None
+
+        try:
+            structure = WikiStructure.model_validate(previous["data"])
+        except Exception as e:
+            logger.warning(f"Ignoring invalid structure in manifest: {e}")
+            return None
+
+        self.record_structure(fingerprint, structure)
+        return structure
+
+    def record_structure(self, fingerprint: str, structure: WikiStructure) -> None:
+        self._structure = {
+            "fingerprint": fingerprint,
+            "data": structure.model_dump(mode="json"),
+        }
+
+    def lookup_page(self, page_id: str, fingerprint: str) -> str | None:
+        """Returns the previously generated content if the page inputs are unchanged."""
+        previous = self._previous_pages.get(page_id)
+        if not previous or previous.get("fingerprint") != fingerprint:
+            return None
+
+        content = previous.get("content")
+        if content is None:
+            return None
+
+        self.record_page(page_id, fingerprint, content)
+        self.reused_pages += 1
+        return content
+
+    def record_page(self, page_id: str, fingerprint: str, content: str) -> None:
+        self._pages[page_id] = {"fingerprint": fingerprint, "content": content}
+
+    def save(self) -> None:
+        """Atomically writes the entries recorded during this run."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "structure": self._structure,
+            "pages": self._pages,
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        logger.info(
+            f"Saved manifest to {self.path} "
+            f"({len(self._pages)} pages, {self.reused_pages} reused)"
+        )
@@ -0,0 +1,106 @@
+"""src.services.prompt_budget
+Fits page source files into a token budget derived from the model's context window.
+"""
+
+from pydantic import BaseModel, Field
+
+from src.agent.token_counter import TokenCounter
+
+# Files that would get less than this many tokens are dropped instead of truncated.
+MIN_EXCERPT_TOKENS = 256
+
+
+class PromptBudgetReport(BaseModel):
+    """Summary of how page files were fitted into the budget."""
+
+    budget_tokens: int
+    used_tokens: int = 0
+    included: list[str] = Field(default_factory=list)
+    truncated: list[str] = Field(default_factory=list)
+    dropped: list[str] = Field(default_factory=list)
+
+
+class PromptBudgeter:
+    """
+    Fits `(path, content)` pairs into `budget_tokens`.
+
+    Files are expected in relevance order (as listed by the wiki structure).
+    Small files are kept whole first; the remaining budget is then split evenly
+    across the larger files, which are truncated with a marker. If that share
+    would be too small to be useful, the least relevant large files are dropped.
+    """
+
+    def __init__(self, counter: TokenCounter, budget_tokens: int):
+        self.counter = counter
+        self.budget_tokens = budget_tokens
+
+    @classmethod
+    def for_context_window(cls, counter: TokenCounter, share: float):
+        return cls(counter, int(counter.context_window * share))
+
+    def fit(
+        self, files: list[tuple[str, str]]
+    ) -> tuple[list[tuple[str, str]], PromptBudgetReport]:
+        report = PromptBudgetReport(budget_tokens=self.budget_tokens)
+        sizes = {path: self.counter.count(content) for path, content in files}
+
+        if sum(sizes.values()) <= self.budget_tokens:
+            report.included = [path for path, _ in files]
+            report.used_tokens = sum(sizes.values())
+            return files, report
+
+        # 1. Keep whole files, smallest first, while each fits its fair share.
+        relevance = {path: rank for rank, (path, _) in enumerate(files)}
+        by_size = sorted(files, key=lambda f: (sizes[f[0]], relevance[f[0]]))
+        remaining = self.budget_tokens
+        whole: set[str] = set()
+        for index, (path, _) in enumerate(by_size):
+            if sizes[path] > remaining // (len(by_size) - index):
+                break
+            whole.add(path)
+            remaining -= sizes[path]
+
+        # 2. Split the rest evenly over the larger files, dropping the least
+        #    relevant ones until every excerpt is worth including. Each drop
+        #    raises the share, so files that now fit it are kept whole.
+        large = [path for path, _ in files if path not in whole]
+        while large:
+            share = remaining // len(large)
+            fitting = [path for path in large if sizes[path] <= share]
+            if fitting:
+                whole.update(fitting)
+                remaining -= sum(sizes[path] for path in fitting)
+                large = [path for path in large if path not in whole]
+            elif share < MIN_EXCERPT_TOKENS:
+                report.dropped.append(large.pop())
+            else:
+                break
+        share = remaining // len(large) if large else 0
+
+        fitted: list[tuple[str, str]] = []
+        for path, content in files:
+            if path in whole:
+                fitted.append((path, content))
+                report.included.append(path)
+                report.used_tokens += sizes[path]
+            elif path in large:
+                fitted.append((path, self._truncate(content, sizes[path], share)))
+                report.truncated.append(path)
+                report.used_tokens += min(share, sizes[path])
+
+        return fitted, report
+
+    @staticmethod
+    def _truncate(content: str, tokens: int, keep_tokens: int) -> str:
+        """Keeps roughly the first `keep_tokens` tokens, cut at a line boundary."""
+        if keep_tokens >= tokens:
+            return content
+        keep_chars = int(len(content) * keep_tokens / tokens)
+        cut = content.rfind("\n", 0, keep_chars)
+        if cut <= 0:
+            cut = keep_chars
+        omitted = tokens - keep_tokens
+        return (
+            f"{content[:cut]}\n"
+            f"... [truncated: ~{omitted} tokens omitted to fit the context window] ..."
+        )
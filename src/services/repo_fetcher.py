@@ -2,11 +2,14 @@
 Service for fetching repository structure and file contents from various providers.
 """
 
+import asyncio
+
 from loguru import logger
 
+from src.core.config import settings
 from src.models.api_schema import WikiGenerationRequest
 from src.models.wiki_schema import RepositoryStructure
-from src.providers.base import RepositoryProvider
+from src.providers.base import FileFetchError, RepositoryProvider
 from src.providers.bitbucket import BitbucketProvider
 from src.providers.github import GitHubProvider
 from src.providers.gitlab import GitLabProvider
@@ -32,21 +35,85 @@ class RepositoryFetcher:
 
         self.provider: RepositoryProvider = provider_class(self.request)
 
+        # 2. Per-run file content cache
+        # Many pages reference the same core files, so each path is fetched once.
+        # Concurrent requests for a path share the same in-flight fetch.
+        self._content_cache: dict[str, str | None] = {}
+        self._inflight: dict[str, asyncio.Task[str | None]] = {}
+        # Pages fetch their files as soon as the structure is known, ahead of
+        # their LLM calls; this bounds the provider requests in flight.
+        self._fetch_slots = asyncio.Semaphore(settings.FILE_FETCH_CONCURRENCY)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
     async def fetch_repository_structure(self) -> RepositoryStructure:
         """Fetches the file tree structure of the repository."""
         logger.info(f"Fetching structure from {self.request.repo_type}...")
         return await self.provider.fetch_structure()
 
+    async def resolve_commit_sha(self) -> str | None:
+        """Resolves the commit SHA of the repository head (None if unknown)."""
+        return await self.provider.resolve_commit_sha()
+
     async def fetch_file_content(self, file_path: str) -> str | None:
         """
         Fetches the content of a specific file.
         Called by WikiStructureDeterminer when generating page content.
+        Results are cached for the lifetime of this fetcher, except failures
+        that may not last (see FileFetchError).
         """
+        if file_path in self._content_cache:
+            self.cache_hits += 1
+            return self._content_cache[file_path]
+
+        task = self._inflight.get(file_path)
+        if task is not None:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            task = asyncio.create_task(self._fetch_uncached(file_path))
+            self._inflight[file_path] = task
+
+        # Shield the shared fetch so one cancelled waiter does not cancel it for all.
+        return await asyncio.shield(task)
+
+    async def _fetch_uncached(self, file_path: str) -> str | None:
         logger.debug(f"Fetching file content: {file_path}")
-        return await self.provider.fetch_file_content(file_path)
+        try:
+            async with self._fetch_slots:
+                content = await self.provider.fetch_file_content(file_path)
+        except FileFetchError as e:
+            # Not cached, so a later page referencing the file tries again
+            logger.warning(f"{e} (not cached)")
+            return None
+        finally:
+            self._inflight.pop(file_path, None)
+        self._content_cache[file_path] = content
+        return content
+
+    def cached_length(self, file_path: str) -> int | None:
+        """Length of a file's content if it was already fetched, else None."""
+        content = self._content_cache.get(file_path)
+        return len(content) if content is not None else None
+
+    def cache_stats(self) -> dict[str, int]:
+        """Returns hit/miss counters of the per-run file content cache."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "cached_files": len(self._content_cache),
+        }
 
     async def close(self):
         """Method for resource cleanup."""
+        for task in self._inflight.values():
+            task.cancel()
+        self._inflight.clear()
+
+        if self.cache_hits or self.cache_misses:
+            logger.info(f"File content cache stats: {self.cache_stats()}")
+        self._content_cache.clear()
+
         if self.provider:
             await self.provider.close()
 
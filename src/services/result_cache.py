@@ -0,0 +1,211 @@
+"""src.services.result_cache
+On-disk cache of finished wikis, keyed by repository commit and generation settings.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from src.core.config import settings
+from src.models.api_schema import WikiGenerationRequest
+from src.models.wiki_schema import WikiStructure
+
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+
+@lru_cache(maxsize=1)
+def prompt_version() -> str:
+    """Short hash of the prompt templates; editing a prompt invalidates the cache."""
+    digest = hashlib.sha256()
+    for path in sorted(PROMPTS_DIR.glob("*.yaml")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+class CachedWikiSummary(BaseModel):
+    """Listing view of a cache entry (without the wiki content)."""
+
+    key: str
+    repository: str
+    commit_sha: str
+    language: str
+    is_comprehensive_view: bool
+    model: str
+    prompt_version: str
+    title: str
+    created_at: float
+    last_used_at: float | None = None
+    size_bytes: int | None = None
+
+
+class CachedWiki(CachedWikiSummary):
+    markdown: str
+    structure: WikiStructure
+    pages: dict[str, str] = Field(default_factory=dict)
+
+
+class WikiResultCache:
+    """
+    Stores consolidated markdown, structure and pages of finished wikis.
+
+    Entries live in `<cache_dir>/<key>.json`. At most `max_entries` are kept;
+    beyond that, the least recently used ones (by mtime, refreshed on every
+    hit) are evicted.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_entries: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def repository_label(request: WikiGenerationRequest) -> str:
+        if request.repo_type == "local":
+            return f"local:{os.path.abspath(request.local_path or '.')}"
+        if request.repo_url:
+            return f"{request.repo_type}:{request.repo_url.rstrip('/')}"
+        return f"{request.repo_type}:{request.repo_owner}/{request.repo_name}"
+
+    @classmethod
+    def make_key(
+        cls, request: WikiGenerationRequest, commit_sha: str, model: str
+    ) -> str:
+        payload = {
+            "repository": cls.repository_label(request),
+            "commit_sha": commit_sha,
+            "language": request.language,
+            "is_comprehensive_view": request.is_comprehensive_view,
+            "model": model,
+            "prompt_version": prompt_version(),
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> CachedWiki | None:
+        """Returns the cached wiki, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            entry = CachedWiki.model_validate_json(path.read_bytes())
+            # Refresh mtime so LRU eviction keeps recently used entries.
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable wiki cache entry {path}: {e}")
+            return None
+
+    def put(self, entry: CachedWiki) -> None:
+        """Atomically writes an entry and enforces the entry limit."""
+        path = self._entry_path(entry.key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(entry.model_dump_json())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write wiki cache entry: {e}")
+            return
+
+        with self._lock:
+            self._evict()
+
+    def list(self) -> list[CachedWikiSummary]:
+        """Returns every entry, most recently used first."""
+        summaries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+                data = json.loads(path.read_bytes())
+                summary = CachedWikiSummary.model_validate(data)
+            except Exception:
+                continue
+            summary.last_used_at = stat.st_mtime
+            summary.size_bytes = stat.st_size
+            summaries.append(summary)
+        summaries.sort(key=lambda s: s.last_used_at or 0, reverse=True)
+        return summaries
+
+    def delete(self, key: str) -> bool:
+        path = self._entry_path(key)
+        if not path.is_file():
+            return False
+        path.unlink(missing_ok=True)
+        return True
+
+    def clear(self) -> int:
+        """Removes every entry; returns how many were removed."""
+        with self._lock:
+            entries = list(self.cache_dir.glob("*.json"))
+            for path in entries:
+                path.unlink(missing_ok=True)
+            return len(entries)
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=lambda item: item[0])
+        for _, path in entries[: len(entries) - self.max_entries]:
+            path.unlink(missing_ok=True)
+        logger.debug(f"Wiki cache evicted {len(entries) - self.max_entries} entries")
+
+
+def build_cached_wiki(
+    key: str,
+    request: WikiGenerationRequest,
+    commit_sha: str,
+    model: str,
+    markdown: str,
+    structure: WikiStructure,
+    pages: dict[str, str],
+) -> CachedWiki:
+    return CachedWiki(
+        key=key,
+        repository=WikiResultCache.repository_label(request),
+        commit_sha=commit_sha,
+        language=request.language,
+        is_comprehensive_view=request.is_comprehensive_view,
+        model=model,
+        prompt_version=prompt_version(),
+        title=structure.title,
+        created_at=time.time(),
+        markdown=markdown,
+        structure=structure,
+        pages=pages,
+    )
+
+
+_cache: WikiResultCache | None = None
+
+
+def get_result_cache() -> WikiResultCache | None:
+    """Returns the process-wide wiki cache, or None if it is disabled."""
+    global _cache
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = WikiResultCache(
+            os.path.expanduser(settings.RESULT_CACHE_DIR),
+            settings.RESULT_CACHE_MAX_ENTRIES,
+        )
+    return _cache
@@ -3,7 +3,8 @@ Service for determining wiki structure and generating content using LLMs.
 """
 
 import asyncio
-from functools import lru_cache
+import time
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -11,13 +12,25 @@ import yaml
 from jinja2 import Template
 from loguru import logger
 
-from src.agent.llm import LLMWikiMaker
+from src.agent.llm import LLMWikiMaker, is_overload_error
+from src.agent.token_counter import get_token_counter
 from src.core.config import settings
-from src.models.api_schema import WikiGenerationRequest
+from src.models.api_schema import PagePreview, WikiGenerationRequest
 from src.models.wiki_schema import WikiPage, WikiStructure
+from src.services.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from src.services.llm_scheduler import get_llm_scheduler
+from src.services.page_manifest import PageManifest
+from src.services.prompt_budget import PromptBudgeter, PromptBudgetReport
 from src.services.repo_fetcher import RepositoryFetcher
+from src.services.task_events import TaskEventStream
+from src.utils.file_content import cap_total_bytes
 from src.utils.generate_file_url import generate_file_url
 
+# Pages are generated in order of importance first (see _page_priority)
+IMPORTANCE_RANK = {"high": 0, "medium": 1, "low": 2}
+# Assumed size of a source file whose content has not been fetched yet
+ESTIMATED_FILE_CHARS = 4000
+
 
 class WikiStructureDeterminer:
     """Determines wiki structure and generates page contents using LLMs."""
@@ -26,6 +39,8 @@ class WikiStructureDeterminer:
         self,
         request: WikiGenerationRequest,
         max_concurrency: int = settings.max_concurrency,
+        manifest: PageManifest | None = None,
+        fetcher: RepositoryFetcher | None = None,
     ):
         self.request = request
         self.wiki_structure: WikiStructure | None = None
@@ -33,22 +48,146 @@ class WikiStructureDeterminer:
 
         # State Management
         self.generated_pages: dict[str, str] = {}
+        # Chunks received so far for pages that are still being streamed
+        self._page_buffers: dict[str, list[str]] = {}
+        # How each page's source files were fitted into the context budget
+        self.page_budget_reports: dict[str, PromptBudgetReport] = {}
         self.pages_in_progress: set[str] = set()
+        # Pages holding their LLM slots, i.e. being generated right now
+        self.pages_generating: set[str] = set()
+        # Wall-clock generation time per finished page (seconds)
+        self.page_durations: dict[str, float] = {}
+        # Pages whose content is an error placeholder
+        self.failed_pages: set[str] = set()
         self.error: str | None = None
+        self._idle = asyncio.Event()
         self.is_loading: bool = False
         self.loading_message: str | None = None
         self.structure_request_in_progress: bool = False
         self.default_branch: str = "main"
+        self._generation_task: asyncio.Task | None = None
 
         # Fetcher maintains an internal httpx session.
-        self.fetcher = RepositoryFetcher(self.request)
+        # An existing fetcher (e.g. the one that fetched the structure) can be
+        # handed over so provider-side state such as a downloaded archive is reused.
+        self.fetcher = fetcher or RepositoryFetcher(self.request)
         self.llm_maker = LLMWikiMaker
 
+        # Previous-run fingerprints for incremental regeneration (optional)
+        self.manifest = manifest
+
+        # Progress events (structure ready, page started/finished, ...)
+        self.events = TaskEventStream()
+
         # Concurrency Control (Limit number of concurrent LLM requests)
-        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # With adaptive concurrency, the limit starts at max_concurrency and then
+        # grows while the provider is healthy and halves on 429s/timeouts (AIMD).
+        if settings.adaptive_concurrency:
+            self.concurrency = AdaptiveConcurrencyLimiter(
+                initial_limit=max_concurrency,
+                min_limit=settings.min_concurrency,
+                max_limit=max(max_concurrency, settings.max_concurrency_ceiling),
+                latency_spike_factor=settings.latency_spike_factor,
+            )
+        else:
+            self.concurrency = AdaptiveConcurrencyLimiter(
+                initial_limit=max_concurrency,
+                min_limit=max_concurrency,
+                max_limit=max_concurrency,
+            )
+
+        # Share of the process-wide LLM slots, granted fairly across all tasks
+        self.llm_share = get_llm_scheduler().register(limiter=self.concurrency)
+
+    @property
+    def is_loading(self) -> bool:
+        return self._is_loading
+
+    @is_loading.setter
+    def is_loading(self, value: bool) -> None:
+        self._is_loading = value
+        if value:
+            self._idle.clear()
+        else:
+            self._idle.set()
+
+    async def wait_until_idle(self) -> None:
+        """Waits (without polling) until structure or content generation stops."""
+        await self._idle.wait()
+
+    @cached_property
+    def _model_name(self) -> str:
+        return self.llm_maker().model_name
+
+    @property
+    def partial_pages(self) -> dict[str, str]:
+        """Content streamed so far for pages that are still being generated."""
+        return {
+            page_id: "".join(chunks) for page_id, chunks in self._page_buffers.items()
+        }
+
+    def _estimated_prompt_size(self, page: WikiPage) -> int:
+        """Characters of the page's source files (estimated until fetched)."""
+        sizes = (self.fetcher.cached_length(file_path) for file_path in page.file_paths)
+        return sum(ESTIMATED_FILE_CHARS if size is None else size for size in sizes)
+
+    def _page_priority(self, page: WikiPage) -> tuple[int, int]:
+        """
+        Sort key for page scheduling: important pages first, so progressive
+        consumers get them early; then longest job first, which shortens the
+        total run when concurrency is limited.
+        """
+        return (
+            IMPORTANCE_RANK.get(page.importance, 1),
+            -self._estimated_prompt_size(page),
+        )
+
+    def page_previews(self, partial_content: bool = True) -> list[PagePreview]:
+        """
+        Status, duration and content of every page in structure order. Pages
+        still generating carry their streamed content only if `partial_content`.
+        """
+        if not self.wiki_structure:
+            return []
+
+        partial_pages = self.partial_pages if partial_content else {}
+        previews = []
+        for page in self.wiki_structure.pages:
+            content = None
+            if page.id in self.generated_pages:
+                status = "failed" if page.id in self.failed_pages else "completed"
+                content = self.generated_pages[page.id]
+            elif page.id in self.pages_generating:
+                status = "generating"
+                content = partial_pages.get(page.id)
+            else:
+                status = "pending"
+            previews.append(
+                PagePreview(
+                    page_id=page.id,
+                    title=page.title,
+                    status=status,
+                    content=content,
+                    duration_seconds=self.page_durations.get(page.id),
+                )
+            )
+        return previews
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current number of LLM calls allowed in flight (for observability)."""
+        return self.concurrency.limit
+
+    def bind_task(self, task_id: str) -> None:
+        """Associates the determiner's events and LLM share with a task ID."""
+        self.events.bind(task_id)
+        self.llm_share.task_id = task_id
 
     async def close(self):
         """[Important] Must be called to clean up resources after use."""
+        if self._generation_task and not self._generation_task.done():
+            self._generation_task.cancel()
+        get_llm_scheduler().unregister(self.llm_share)
         await self.fetcher.close()
 
     async def __aenter__(self):
@@ -111,52 +250,163 @@ class WikiStructureDeterminer:
         # Results are returned as a list in the same order (may include None)
         contents = await asyncio.gather(*fetch_tasks)
 
-        # 3. Content formatting
-        content_list = []
+        # 3. Fit contents into the context budget
+        files = []
         for file_path, content in zip(page.file_paths, contents):
             if content:
-                content_list.append(f"--- {file_path} ---\n{content}\n")
+                files.append((file_path, content))
             else:
                 logger.warning(f"Skipping content for {file_path} (not found or empty)")
 
-        return "\n".join(content_list), url_list
+        files, excerpted = cap_total_bytes(files, settings.MAX_PAGE_FILE_BYTES)
+        if excerpted:
+            logger.info(
+                f"Page '{page.title}' source files exceed "
+                f"{settings.MAX_PAGE_FILE_BYTES} bytes; using excerpts of {excerpted}"
+            )
 
-    async def generate_page_content(self, page: WikiPage, language: str = "en") -> None:
-        """Generate individual page content with semaphore logic."""
+        budgeter = PromptBudgeter.for_context_window(
+            get_token_counter(self._model_name), settings.PROMPT_CONTEXT_SHARE
+        )
+        fitted_files, report = await asyncio.to_thread(budgeter.fit, files)
+        self.page_budget_reports[page.id] = report
+        if report.truncated or report.dropped:
+            logger.warning(
+                f"Page '{page.title}' exceeds the context budget "
+                f"({report.budget_tokens} tokens): truncated {report.truncated}, "
+                f"dropped {report.dropped}"
+            )
 
-        async with self.semaphore:  # Limit concurrent LLM calls
-            logger.info(f"Generating content for page: {page.title}")
-            try:
-                prompt_template_str, input_vars, template_format = (
-                    self._load_prompt_template("prompts/wiki_contents_generator.yaml")
-                )
+        # 4. Content formatting
+        content_list = [
+            f"--- {file_path} ---\n{content}\n" for file_path, content in fitted_files
+        ]
+        content_list.extend(
+            f"--- {file_path} ---\n[Omitted: does not fit the context window]\n"
+            for file_path in report.dropped
+        )
 
-                template = Template(prompt_template_str)
+        return "\n".join(content_list), url_list
 
-                relevant_content, file_urls = await self._fetch_and_format_files(page)
+    async def _build_page_prompt(self, page: WikiPage, language: str) -> str:
+        """Renders the page prompt, fetching the page's source files."""
+        prompt_template_str, input_vars, template_format = self._load_prompt_template(
+            "prompts/wiki_contents_generator.yaml"
+        )
 
-                formatted_prompt = template.render(
-                    pageTitle=page.title,
-                    filePaths=file_urls,
-                    relevant_source_files_content=relevant_content,
-                    language=language,
-                    use_structured_output=settings.USE_STRUCTURED_OUTPUT,
-                )
+        template = Template(prompt_template_str)
 
-                # 4. Get LLM Instance
-                llm = LLMWikiMaker()
-                generated_content = await llm.ainvoke(formatted_prompt)
+        relevant_content, file_urls = await self._fetch_and_format_files(page)
 
-                self.generated_pages[page.id] = generated_content
-                logger.info(f"Completed: {page.title}")
+        return template.render(
+            pageTitle=page.title,
+            filePaths=file_urls,
+            relevant_source_files_content=relevant_content,
+            language=language,
+            use_structured_output=settings.USE_STRUCTURED_OUTPUT,
+        )
 
-            except Exception as e:
-                logger.error(f"Error generating page {page.title}: {e}")
-                self.generated_pages[page.id] = self._build_error_placeholder(
-                    page.title, str(e), language
+    async def generate_page_content(self, page: WikiPage, language: str = "en") -> None:
+        """
+        Generates one page in two stages: the prompt (with the page's source
+        files) is prepared first, and LLM slots are only taken once it is ready,
+        so slow file fetches never keep LLM capacity idle.
+        """
+        started_at = time.monotonic()
+        success, reused, cancelled = True, False, False
+        try:
+            formatted_prompt = await self._build_page_prompt(page, language)
+
+            # 4. Get LLM Instance
+            llm = LLMWikiMaker()
+
+            # 5. Reuse the previous content if the page inputs are unchanged
+            fingerprint = None
+            if self.manifest:
+                fingerprint = PageManifest.fingerprint(llm.model_name, formatted_prompt)
+                reused_content = self.manifest.lookup_page(page.id, fingerprint)
+                if reused_content is not None:
+                    self.events.publish(
+                        "page_started", page_id=page.id, title=page.title
+                    )
+                    self.generated_pages[page.id] = reused_content
+                    logger.info(f"Unchanged, reusing: {page.title}")
+                    reused = True
+                    return
+
+            # 6. Limit concurrent LLM calls (per task, then process-wide);
+            #    waiting pages are served by priority
+            priority = self._page_priority(page)
+            async with (
+                self.concurrency.slot(priority),
+                self.llm_share.slot(priority),
+            ):
+                logger.info(f"Generating content for page: {page.title}")
+                self.pages_generating.add(page.id)
+                self.events.publish("page_started", page_id=page.id, title=page.title)
+                # Durations and latency are measured from here on
+                started_at = llm_started_at = time.monotonic()
+                try:
+                    if settings.LLM_STREAMING:
+                        generated_content = await self._stream_page_content(
+                            llm, page.id, formatted_prompt
+                        )
+                    else:
+                        generated_content = await llm.ainvoke(formatted_prompt)
+                except Exception as e:
+                    if is_overload_error(e):
+                        self.concurrency.record_overload(
+                            llm_started_at, type(e).__name__
+                        )
+                    raise
+            if not llm.last_response_cached:
+                self.concurrency.record_success(llm_started_at)
+
+            self.generated_pages[page.id] = generated_content
+            if self.manifest and fingerprint:
+                self.manifest.record_page(page.id, fingerprint, generated_content)
+            logger.info(f"Completed: {page.title}")
+
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        except Exception as e:
+            logger.error(f"Error generating page {page.title}: {e}")
+            success = False
+            self.failed_pages.add(page.id)
+            self.generated_pages[page.id] = self._build_error_placeholder(
+                page.title, str(e), language
+            )
+        finally:
+            duration = round(time.monotonic() - started_at, 3)
+            self.pages_in_progress.discard(page.id)
+            self.pages_generating.discard(page.id)
+            if not cancelled:
+                self.page_durations[page.id] = duration
+                self.events.publish(
+                    "page_finished",
+                    page_id=page.id,
+                    title=page.title,
+                    duration_seconds=duration,
+                    success=success,
+                    reused=reused,
+                    completed_pages=len(self.generated_pages),
+                    total_pages=len(self.wiki_structure.pages)
+                    if self.wiki_structure
+                    else 0,
                 )
-            finally:
-                self.pages_in_progress.discard(page.id)
+
+    async def _stream_page_content(
+        self, llm: LLMWikiMaker, page_id: str, prompt: str
+    ) -> str:
+        """Streams a page into its buffer so partial content is visible early."""
+        chunks = self._page_buffers.setdefault(page_id, [])
+        try:
+            async for chunk in llm.astream(prompt):
+                chunks.append(chunk)
+            return "".join(chunks)
+        finally:
+            self._page_buffers.pop(page_id, None)
 
     @staticmethod
     def _build_error_placeholder(page_title: str, error_msg: str, language: str) -> str:
@@ -213,18 +463,39 @@ class WikiStructureDeterminer:
                 use_structured_output=settings.USE_STRUCTURED_OUTPUT,
             )
 
-            logger.info("Invoking LLM for structure...")
-
-            wiki_structure = await llm.ainvoke(formatted_prompt)
+            fingerprint = None
+            wiki_structure = None
+            if self.manifest:
+                fingerprint = PageManifest.fingerprint(llm.model_name, formatted_prompt)
+                wiki_structure = self.manifest.lookup_structure(fingerprint)
+                if wiki_structure:
+                    logger.info("File tree unchanged, reusing previous wiki structure.")
+
+            if wiki_structure is None:
+                logger.info("Invoking LLM for structure...")
+                async with self.llm_share:
+                    wiki_structure = await llm.ainvoke(formatted_prompt)
+                if self.manifest and fingerprint:
+                    self.manifest.record_structure(fingerprint, wiki_structure)
 
             self.wiki_structure = wiki_structure
             self.current_page_id = (
                 wiki_structure.pages[0].id if wiki_structure.pages else None
             )
+            self.events.publish(
+                "structure_ready",
+                title=wiki_structure.title,
+                description=wiki_structure.description,
+                total_pages=len(wiki_structure.pages),
+                pages=[
+                    {"page_id": p.id, "title": p.title, "importance": p.importance}
+                    for p in wiki_structure.pages
+                ],
+            )
 
             if generate_contents and wiki_structure.pages:
-                # Execute as a background task
-                asyncio.create_task(
+                # Execute as a background task (kept so close() can cancel it)
+                self._generation_task = asyncio.create_task(
                     self._start_content_generation_flow(language=self.request.language)
                 )
             else:
@@ -254,10 +525,8 @@ class WikiStructureDeterminer:
 
         logger.info(self.loading_message)
 
-        tasks = [
-            self.generate_page_content(page, language)
-            for page in self.wiki_structure.pages
-        ]
+        pages = sorted(self.wiki_structure.pages, key=self._page_priority)
+        tasks = [self.generate_page_content(page, language) for page in pages]
 
         await self.run_page_generation_tasks(tasks)
 
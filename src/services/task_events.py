@@ -0,0 +1,71 @@
+"""src.services.task_events
+Publish/subscribe stream of progress events for a single wiki generation task.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from src.models.api_schema import TaskEvent, TaskEventType
+
+TERMINAL_EVENTS: set[str] = {"task_completed", "task_failed", "task_cancelled"}
+
+
+class TaskEventStream:
+    """
+    Fan-out of progress events to any number of subscribers.
+
+    Every event is kept in a history so late subscribers (e.g. a client that
+    connects after the structure was determined) first receive a replay.
+    """
+
+    def __init__(self, task_id: str | None = None):
+        self.task_id = task_id
+        self.history: list[TaskEvent] = []
+        self._subscribers: set[asyncio.Queue[TaskEvent]] = set()
+
+    def bind(self, task_id: str) -> None:
+        """Attaches the task ID, including to events published before it was known."""
+        self.task_id = task_id
+        for past_event in self.history:
+            past_event.task_id = task_id
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.history) and self.history[-1].event in TERMINAL_EVENTS
+
+    def publish(self, event: TaskEventType, **data: Any) -> TaskEvent:
+        task_event = TaskEvent(
+            event=event, task_id=self.task_id, timestamp=time.time(), data=data
+        )
+        self.history.append(task_event)
+        for queue in self._subscribers:
+            queue.put_nowait(task_event)
+        return task_event
+
+    async def subscribe(
+        self, keepalive: float | None = None
+    ) -> AsyncIterator[TaskEvent | None]:
+        """
+        Yields past and future events until a terminal event is seen.
+        If `keepalive` is set, yields None whenever no event arrived for that long.
+        """
+        queue: asyncio.Queue[TaskEvent] = asyncio.Queue()
+        for past_event in self.history:
+            queue.put_nowait(past_event)
+        self._subscribers.add(queue)
+
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except TimeoutError:
+                    yield None
+                    continue
+
+                yield event
+                if event.event in TERMINAL_EVENTS:
+                    return
+        finally:
+            self._subscribers.discard(queue)
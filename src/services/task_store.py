@@ -1,14 +1,48 @@
 """src.services.task_store
-Simple in-memory task store for tracking wiki generation status.
+Task store for tracking wiki generation status.
+
+Two backends are available (selected with TASK_STORE_BACKEND):
+- "sqlite": persistent, shared by every worker process on the host (default).
+- "memory": process-local dict, e.g. for tests or single-process runs.
+
+A finished task keeps its status: updates are applied only while it is in
+progress, so e.g. a late "completed" cannot overwrite "cancelled". The one
+exception is a cancelled task, which its run may update with the partial
+result. The store is synchronous; async code calls it with `asyncio.to_thread`.
+
+Running tasks refresh a heartbeat (`updated_at`); identical requests only
+attach to in-progress tasks heard from within TASK_STALE_SECONDS, so a task
+left behind by a killed process does not capture them.
+
+Retention: large results are spilled to files under TASK_RESULT_DIR, and a
+periodic sweep evicts tasks past TASK_TTL_SECONDS (running tasks only once
+their heartbeat has stopped), then the oldest finished tasks beyond
+TASK_MAX_COUNT / TASK_STORE_MAX_MB.
 """
 
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
 import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
 from typing import Any, Literal
 
+from loguru import logger
 from pydantic import BaseModel
 
+from src.core.config import settings
+
 TaskId = str
-TaskStatus = Literal["in_progress", "completed", "failed"]
+TaskStatus = Literal["in_progress", "completed", "failed", "cancelled"]
+
+
+def _may_update(current: TaskStatus, status: TaskStatus) -> bool:
+    return current == "in_progress" or current == status == "cancelled"
 
 
 class Task(BaseModel):
@@ -17,30 +51,510 @@ class Task(BaseModel):
     result: Any = None
 
 
-# In-memory storage for tasks.
-# NOTE: This is not suitable for production with multiple workers.
-# For that, a shared storage like Redis or a database would be needed.
-tasks: dict[TaskId, Task] = {}
+class TaskRecord(BaseModel):
+    """Stored form of a task: the result is either inline JSON or a spill file."""
+
+    task_id: TaskId
+    status: TaskStatus
+    result_json: str | None = None
+    result_path: str | None = None
+    result_bytes: int = 0
+    # Identifies identical requests; duplicates attach to the in-progress task
+    coalesce_key: str | None = None
+    created_at: float
+    updated_at: float
+
+
+class TaskStore(ABC):
+    """Interface shared by the task store backends."""
+
+    def __init__(
+        self,
+        result_dir: str | Path | None = None,
+        spill_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+        max_tasks: int | None = None,
+        max_bytes: int | None = None,
+        stale_seconds: float | None = None,
+    ):
+        self.result_dir = Path(result_dir or settings.TASK_RESULT_DIR).expanduser()
+        self.spill_bytes = (
+            spill_bytes
+            if spill_bytes is not None
+            else settings.TASK_RESULT_SPILL_KB * 1024
+        )
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None else settings.TASK_TTL_SECONDS
+        )
+        self.max_tasks = max_tasks if max_tasks is not None else settings.TASK_MAX_COUNT
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else settings.TASK_STORE_MAX_MB * 1024**2
+        )
+        self.stale_seconds = (
+            stale_seconds if stale_seconds is not None else settings.TASK_STALE_SECONDS
+        )
+
+    @abstractmethod
+    def create(self, task: Task) -> None: ...
+
+    @abstractmethod
+    def get(self, task_id: TaskId) -> Task | None: ...
+
+    @abstractmethod
+    def update(self, task_id: TaskId, status: TaskStatus, result: Any) -> bool:
+        """
+        Updates a task unless it has finished; returns False if it does not
+        exist or the update was refused.
+        """
+
+    @abstractmethod
+    def touch(self, task_id: TaskId) -> None:
+        """Refreshes the heartbeat (`updated_at`) of an in-progress task."""
+
+    @abstractmethod
+    def create_or_attach(self, task: Task, coalesce_key: str) -> tuple[Task, bool]:
+        """
+        Atomically returns the in-progress task with `coalesce_key`, or stores
+        `task` under that key. The flag is True if `task` was created.
+        Tasks without a heartbeat for `stale_seconds` are not attached to.
+        """
+
+    @abstractmethod
+    def sweep(self, now: float | None = None) -> int:
+        """Applies the retention policy; returns the number of evicted tasks."""
+
+    def _ttl_cutoffs(self, now: float) -> tuple[float, float]:
+        """
+        `updated_at` before which finished and in-progress tasks expire. Running
+        tasks refresh a heartbeat, so an in-progress task only expires once it
+        has also been silent for TASK_STALE_SECONDS, i.e. it is orphaned.
+        """
+        return (
+            now - self.ttl_seconds,
+            now - max(self.ttl_seconds, self.stale_seconds),
+        )
+
+    def _encode(
+        self,
+        task_id: TaskId,
+        status: TaskStatus,
+        result: Any,
+        created_at: float,
+        coalesce_key: str | None = None,
+    ) -> TaskRecord:
+        """Serializes a result, spilling it to a file if it is too large."""
+        result_json = json.dumps(result, default=str)
+        record = TaskRecord(
+            task_id=task_id,
+            status=status,
+            result_json=result_json,
+            result_bytes=len(result_json),
+            coalesce_key=coalesce_key,
+            created_at=created_at,
+            updated_at=time.time(),
+        )
+        if self.spill_bytes and record.result_bytes > self.spill_bytes:
+            record.result_path = str(self._spill(task_id, result_json))
+            record.result_json = None
+        else:
+            self._remove_spill(self.result_dir / f"{task_id}.json")
+        return record
+
+    def _spill(self, task_id: TaskId, result_json: str) -> Path:
+        self.result_dir.mkdir(parents=True, exist_ok=True)
+        path = self.result_dir / f"{task_id}.json"
+        fd, tmp_path = tempfile.mkstemp(dir=self.result_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(result_json)
+            os.replace(tmp_path, path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return path
+
+    @staticmethod
+    def _remove_spill(path: str | Path | None) -> None:
+        if path:
+            Path(path).unlink(missing_ok=True)
+
+    @staticmethod
+    def _decode(record: TaskRecord) -> Task:
+        result = None
+        if record.result_path:
+            try:
+                result = json.loads(Path(record.result_path).read_text("utf-8"))
+            except Exception as e:
+                logger.warning(f"Task {record.task_id}: result file unreadable: {e}")
+        elif record.result_json is not None:
+            result = json.loads(record.result_json)
+        return Task(task_id=record.task_id, status=record.status, result=result)
+
+
+class InMemoryTaskStore(TaskStore):
+    """Process-local store. Not shared between worker processes."""
+
+    def __init__(self, **retention: Any):
+        super().__init__(**retention)
+        self.tasks: dict[TaskId, TaskRecord] = {}
+        # Callers run in worker threads (asyncio.to_thread)
+        self._lock = threading.Lock()
+
+    def create(self, task: Task) -> None:
+        with self._lock:
+            self.tasks[task.task_id] = self._encode(
+                task.task_id, task.status, task.result, time.time()
+            )
+
+    def get(self, task_id: TaskId) -> Task | None:
+        record = self.tasks.get(task_id)
+        return self._decode(record) if record else None
+
+    def update(self, task_id: TaskId, status: TaskStatus, result: Any) -> bool:
+        with self._lock:
+            record = self.tasks.get(task_id)
+            if not record or not _may_update(record.status, status):
+                return False
+            self.tasks[task_id] = self._encode(
+                task_id, status, result, record.created_at, record.coalesce_key
+            )
+            return True
+
+    def touch(self, task_id: TaskId) -> None:
+        with self._lock:
+            record = self.tasks.get(task_id)
+            if record and record.status == "in_progress":
+                record.updated_at = time.time()
+
+    def create_or_attach(self, task: Task, coalesce_key: str) -> tuple[Task, bool]:
+        fresh_after = time.time() - self.stale_seconds
+        with self._lock:
+            for record in self.tasks.values():
+                if (
+                    record.coalesce_key == coalesce_key
+                    and record.status == "in_progress"
+                    and record.updated_at >= fresh_after
+                ):
+                    return self._decode(record), False
+            self.tasks[task.task_id] = self._encode(
+                task.task_id, task.status, task.result, time.time(), coalesce_key
+            )
+            return task, True
+
+    def sweep(self, now: float | None = None) -> int:
+        with self._lock:
+            return self._sweep(now)
+
+    def _sweep(self, now: float | None) -> int:
+        now = now or time.time()
+        finished_cutoff, running_cutoff = self._ttl_cutoffs(now)
+        evicted = [
+            r
+            for r in self.tasks.values()
+            if self.ttl_seconds
+            and r.updated_at
+            < (running_cutoff if r.status == "in_progress" else finished_cutoff)
+        ]
+        for record in evicted:
+            del self.tasks[record.task_id]
+
+        # Oldest finished tasks go first; running tasks are never evicted here.
+        finished = sorted(
+            (r for r in self.tasks.values() if r.status != "in_progress"),
+            key=lambda r: r.updated_at,
+        )
+        total_bytes = sum(r.result_bytes for r in self.tasks.values())
+        for record in finished:
+            if len(self.tasks) <= self.max_tasks and total_bytes <= self.max_bytes:
+                break
+            del self.tasks[record.task_id]
+            total_bytes -= record.result_bytes
+            evicted.append(record)
+
+        for record in evicted:
+            self._remove_spill(record.result_path)
+        return len(evicted)
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    SQLite store in WAL mode, so several processes (e.g. gunicorn workers) can
+    read concurrently while one writes, and tasks survive restarts.
+
+    Each thread uses its own connection; every statement commits on its own.
+    """
+
+    # The inline result lives in the "result" column
+    _COLUMNS = (
+        "task_id, status, result, result_path, result_bytes, coalesce_key, "
+        "created_at, updated_at"
+    )
+
+    def __init__(self, path: str | Path, **retention: Any):
+        super().__init__(**retention)
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+        if "result_path" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN result_path TEXT")
+        if "result_bytes" not in columns:
+            conn.execute(
+                "ALTER TABLE tasks ADD COLUMN result_bytes INTEGER NOT NULL DEFAULT 0"
+            )
+        if "coalesce_key" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN coalesce_key TEXT")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_updated_at ON tasks (updated_at)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_coalesce_key ON tasks (coalesce_key)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, record: TaskRecord) -> None:
+        self._connection().execute(
+            f"INSERT OR REPLACE INTO tasks ({self._COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.task_id,
+                record.status,
+                record.result_json,
+                record.result_path,
+                record.result_bytes,
+                record.coalesce_key,
+                record.created_at,
+                record.updated_at,
+            ),
+        )
+
+    def _read(self, task_id: TaskId) -> TaskRecord | None:
+        row = (
+            self._connection()
+            .execute(f"SELECT {self._COLUMNS} FROM tasks WHERE task_id = ?", (task_id,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        (task_id, status, result, result_path, result_bytes, key, created, updated) = (
+            row
+        )
+        return TaskRecord(
+            task_id=task_id,
+            status=status,
+            result_json=result,
+            result_path=result_path,
+            result_bytes=result_bytes,
+            coalesce_key=key,
+            created_at=created,
+            updated_at=updated,
+        )
+
+    def create(self, task: Task) -> None:
+        self._write(self._encode(task.task_id, task.status, task.result, time.time()))
+
+    def get(self, task_id: TaskId) -> Task | None:
+        record = self._read(task_id)
+        return self._decode(record) if record else None
+
+    def update(self, task_id: TaskId, status: TaskStatus, result: Any) -> bool:
+        conn = self._connection()
+        # Read and write in one transaction, so the status cannot change
+        # (e.g. to "cancelled" by another process) in between.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            record = self._read(task_id)
+            updated = record is not None and _may_update(record.status, status)
+            if updated:
+                self._write(
+                    self._encode(
+                        task_id, status, result, record.created_at, record.coalesce_key
+                    )
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return updated
+
+    def touch(self, task_id: TaskId) -> None:
+        self._connection().execute(
+            "UPDATE tasks SET updated_at = ? "
+            "WHERE task_id = ? AND status = 'in_progress'",
+            (time.time(), task_id),
+        )
+
+    def create_or_attach(self, task: Task, coalesce_key: str) -> tuple[Task, bool]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT task_id FROM tasks "
+                "WHERE coalesce_key = ? AND status = 'in_progress' "
+                "AND updated_at >= ? LIMIT 1",
+                (coalesce_key, time.time() - self.stale_seconds),
+            ).fetchone()
+            if row is None:
+                self._write(
+                    self._encode(
+                        task.task_id,
+                        task.status,
+                        task.result,
+                        time.time(),
+                        coalesce_key,
+                    )
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return task, True
+        existing = self.get(row[0])
+        if existing is None:  # Evicted in the meantime
+            self.create(task)
+            return task, True
+        return existing, False
+
+    def sweep(self, now: float | None = None) -> int:
+        now = now or time.time()
+        conn = self._connection()
+        evicted: list[tuple[str, str | None]] = []
+
+        if self.ttl_seconds:
+            finished_cutoff, running_cutoff = self._ttl_cutoffs(now)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = conn.execute(
+                    "SELECT task_id, result_path FROM tasks WHERE updated_at < ? "
+                    "AND (status != 'in_progress' OR updated_at < ?)",
+                    (finished_cutoff, running_cutoff),
+                ).fetchall()
+                conn.executemany(
+                    "DELETE FROM tasks WHERE task_id = ?", [(t,) for t, _ in expired]
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            evicted += expired
+
+        count, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(result_bytes), 0) FROM tasks"
+        ).fetchone()
+        if count > self.max_tasks or total_bytes > self.max_bytes:
+            # Oldest finished tasks go first; running tasks are never evicted here.
+            doomed: list[tuple[str, str | None]] = []
+            for task_id, result_path, result_bytes in conn.execute(
+                "SELECT task_id, result_path, result_bytes FROM tasks "
+                "WHERE status != 'in_progress' ORDER BY updated_at"
+            ).fetchall():
+                if count <= self.max_tasks and total_bytes <= self.max_bytes:
+                    break
+                doomed.append((task_id, result_path))
+                count -= 1
+                total_bytes -= result_bytes
+
+            conn.executemany(
+                "DELETE FROM tasks WHERE task_id = ?", [(t,) for t, _ in doomed]
+            )
+            evicted += doomed
+
+        for _, result_path in evicted:
+            self._remove_spill(result_path)
+        return len(evicted)
+
+
+_store: TaskStore | None = None
+
+
+def get_task_store() -> TaskStore:
+    """Returns the configured task store (created on first use)."""
+    global _store
+    if _store is None:
+        if settings.TASK_STORE_BACKEND == "sqlite":
+            _store = SQLiteTaskStore(settings.TASK_STORE_PATH)
+            logger.info(f"Using SQLite task store at {settings.TASK_STORE_PATH}")
+        else:
+            _store = InMemoryTaskStore()
+    return _store
 
 
 def create_task(initial_message: str = "Task started.") -> Task:
     """Creates a new task and stores it."""
     task_id = str(uuid.uuid4())
     task = Task(task_id=task_id, result=initial_message)
-    tasks[task_id] = task
+    get_task_store().create(task)
     return task
 
 
+def create_or_attach_task(
+    coalesce_key: str, initial_message: str = "Task started."
+) -> tuple[Task, bool]:
+    """
+    Creates a task unless an identical request (same `coalesce_key`) is still
+    in progress, in which case that task is returned. The flag is True if the
+    task was newly created.
+    """
+    task = Task(task_id=str(uuid.uuid4()), result=initial_message)
+    return get_task_store().create_or_attach(task, coalesce_key)
+
+
 def get_task(task_id: TaskId) -> Task | None:
     """Retrieves a task from storage."""
-    return tasks.get(task_id)
+    return get_task_store().get(task_id)
+
+
+def touch_task(task_id: TaskId) -> None:
+    """Refreshes the heartbeat of a running task."""
+    get_task_store().touch(task_id)
+
+
+def update_task_status(task_id: TaskId, status: TaskStatus, result: Any = None) -> bool:
+    """
+    Updates the status and result of a task. Returns False if the task does
+    not exist or has already finished (its status is then left unchanged).
+    """
+    if get_task_store().update(task_id, status, result):
+        return True
+    logger.warning(
+        f"Task ID {task_id} not found or already finished; "
+        f"update to '{status}' ignored."
+    )
+    return False
 
 
-def update_task_status(task_id: TaskId, status: TaskStatus, result: Any = None):
-    """Updates the status and result of a task."""
-    task = get_task(task_id)
-    if task:
-        task.status = status
-        task.result = result
-    else:
-        print(f"Warning: Task ID {task_id} not found for update.")
+async def run_task_sweeper(interval_seconds: float) -> None:
+    """Periodically applies the task retention policy (runs until cancelled)."""
+    store = get_task_store()
+    while True:
+        try:
+            evicted = await asyncio.to_thread(store.sweep)
+            if evicted:
+                logger.info(f"Task sweeper evicted {evicted} task(s)")
+        except Exception as e:
+            logger.warning(f"Task sweep failed: {e}")
+        await asyncio.sleep(interval_seconds)
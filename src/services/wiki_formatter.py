@@ -17,25 +17,35 @@ class WikiFormatter:
     @staticmethod
     def consolidate_markdown(structure: WikiStructure, pages: dict[str, str]) -> str:
         """Consolidate wiki structure and pages into a single markdown string."""
+        return WikiFormatter.consolidate_pages(
+            structure.title,
+            structure.description,
+            [(page.title, pages.get(page.id, "")) for page in structure.pages],
+        )
+
+    @staticmethod
+    def consolidate_pages(
+        title: str, description: str, pages: list[tuple[str, str]]
+    ) -> str:
+        """Consolidate `(page title, content)` pairs into a single markdown string."""
         content = [
-            f"# {structure.title}\n",
-            f"{structure.description}\n",
+            f"# {title}\n",
+            f"{description}\n",
             "## Table of Contents\n",
         ]
 
         # Generate Table of Contents
-        for page in structure.pages:
+        for page_title, _ in pages:
             anchor = (
-                WikiFormatter.sanitize_filename(page.title).lower().replace("_", "-")
+                WikiFormatter.sanitize_filename(page_title).lower().replace("_", "-")
             )
-            content.append(f"- [{page.title}](#{anchor})")
+            content.append(f"- [{page_title}](#{anchor})")
         content.append("\n---\n")
 
         # Generate Body Content
-        for page in structure.pages:
-            page_content = pages.get(page.id, "")
+        for page_title, page_content in pages:
             anchor = (
-                WikiFormatter.sanitize_filename(page.title).lower().replace("_", "-")
+                WikiFormatter.sanitize_filename(page_title).lower().replace("_", "-")
             )
             content.append(f'<a name="{anchor}"></a>\n')
             content.append(page_content)
@@ -3,20 +3,39 @@ Main service for coordinating the end-to-end wiki generation pipeline.
 """
 
 import asyncio
+import hashlib
 import os
 
 from loguru import logger
 
+from src.agent.llm import resolve_model_name
 from src.models.api_schema import WikiGenerationRequest
 from src.models.wiki_schema import WikiStructure
+from src.services.page_manifest import PageManifest
 from src.services.repo_fetcher import RepositoryFetcher
+from src.services.result_cache import (
+    CachedWiki,
+    WikiResultCache,
+    build_cached_wiki,
+    get_result_cache,
+)
 from src.services.structure_analyzer import WikiStructureDeterminer
 from src.services.wiki_formatter import WikiFormatter
 
 
 class WikiGenerationService:
-    def __init__(self, request: WikiGenerationRequest):
+    def __init__(
+        self,
+        request: WikiGenerationRequest,
+        manifest: PageManifest | None = None,
+        commit_sha: str | None = None,
+    ):
         self.request = request
+        # If provided, unchanged pages from the previous run are reused.
+        self.manifest = manifest
+        # Head commit of the repository, resolved once per service (see below)
+        self.commit_sha = commit_sha
+        self._commit_sha_resolved = commit_sha is not None
 
     @staticmethod
     def validate_request(request: WikiGenerationRequest):
@@ -32,6 +51,72 @@ class WikiGenerationService:
                 "Ensure repo_url is correctly formatted."
             )
 
+    async def resolve_commit_sha(self) -> str | None:
+        """Resolves (once) the commit SHA of the repository head, if available."""
+        if not self._commit_sha_resolved:
+            async with RepositoryFetcher(self.request) as fetcher:
+                self.commit_sha = await fetcher.resolve_commit_sha()
+            self._commit_sha_resolved = True
+        return self.commit_sha
+
+    async def _result_cache_key(self) -> tuple[WikiResultCache, str] | None:
+        cache = get_result_cache()
+        if cache is None or not (commit_sha := await self.resolve_commit_sha()):
+            return None
+        model_name = resolve_model_name()
+        return cache, cache.make_key(self.request, commit_sha, model_name)
+
+    async def lookup_cached_result(self) -> CachedWiki | None:
+        """Returns the cached wiki for this repository commit and settings."""
+        cache_and_key = await self._result_cache_key()
+        if cache_and_key is None:
+            return None
+        cache, key = cache_and_key
+        entry = await asyncio.to_thread(cache.get, key)
+        if entry:
+            logger.info(f"Wiki cache hit for {entry.repository}@{entry.commit_sha[:7]}")
+        return entry
+
+    async def store_cached_result(self, result: dict) -> None:
+        """Caches a finished wiki unless some pages failed to generate."""
+        if result.get("failed_pages"):
+            return
+        cache_and_key = await self._result_cache_key()
+        if cache_and_key is None:
+            return
+        cache, key = cache_and_key
+        entry = build_cached_wiki(
+            key,
+            self.request,
+            self.commit_sha or "",
+            resolve_model_name(),
+            result["markdown"],
+            result["structure"],
+            result["pages"],
+        )
+        await asyncio.to_thread(cache.put, entry)
+
+    async def resolve_coalesce_key(self, save_file: bool) -> str:
+        """
+        Key under which identical concurrent requests are coalesced: provider,
+        repository, resolved commit SHA, language, view mode and output mode.
+        Falls back to the branch head ("HEAD") if the SHA cannot be resolved.
+        """
+        commit_sha = await self.resolve_commit_sha()
+        request = self.request
+        parts = [
+            request.repo_type,
+            request.repo_url or "",
+            request.repo_owner or "",
+            request.repo_name or "",
+            os.path.abspath(request.local_path) if request.local_path else "",
+            commit_sha or "HEAD",
+            request.language,
+            str(request.is_comprehensive_view),
+            "file" if save_file else "text",
+        ]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
     async def prepare_generation(self) -> WikiStructureDeterminer:
         """
         Initializes the determiner and fetches the initial structure.
@@ -41,8 +126,7 @@ class WikiGenerationService:
 
     async def _wait_for_completion(self, determiner: WikiStructureDeterminer):
         """Helper to wait for the determiner to finish generation."""
-        while determiner.is_loading or determiner.pages_in_progress:
-            await asyncio.sleep(2)
+        await determiner.wait_until_idle()
 
         if determiner.error:
             raise RuntimeError(f"Wiki generation error: {determiner.error}")
@@ -68,6 +152,7 @@ class WikiGenerationService:
                 - markdown: The consolidated markdown string
                 - structure: WikiStructure object (sections/pages hierarchy)
                 - pages: Dict mapping page_id to markdown content
+                - failed_pages: IDs of pages that hold an error placeholder
         """
 
         # 1. Start from scratch if no determiner is provided (Auto-pilot)
@@ -101,6 +186,7 @@ class WikiGenerationService:
                 ),
                 "structure": structure,
                 "pages": pages,
+                "failed_pages": sorted(determiner.failed_pages),
             }
         finally:
             if should_close_determiner:
@@ -109,20 +195,31 @@ class WikiGenerationService:
     async def _initialize_and_determine(self) -> WikiStructureDeterminer:
         """Initializes components and determines the wiki structure."""
         # 1. Get Repository Structure
-        async with RepositoryFetcher(self.request) as fetcher:
+        # The fetcher is handed over to the determiner, which closes it.
+        fetcher = RepositoryFetcher(self.request)
+        try:
             repo_struct = await fetcher.fetch_repository_structure()
             if repo_struct.error:
                 raise ValueError(f"Repo fetch failed: {repo_struct.error}")
+        except BaseException:  # including cancellation
+            await fetcher.close()
+            raise
 
         # 2. Determine Repository Structure
-        determiner = WikiStructureDeterminer(self.request)
+        determiner = WikiStructureDeterminer(
+            self.request, manifest=self.manifest, fetcher=fetcher
+        )
         determiner.default_branch = repo_struct.default_branch
 
-        await determiner.determine_wiki_structure(
-            file_tree=repo_struct.file_tree,
-            readme=repo_struct.readme,
-            generate_contents=False,
-        )
+        try:
+            await determiner.determine_wiki_structure(
+                file_tree=repo_struct.file_tree,
+                readme=repo_struct.readme,
+                generate_contents=False,
+            )
+        except asyncio.CancelledError:
+            await determiner.close()
+            raise
 
         if determiner.error:
             await determiner.close()
@@ -2,44 +2,206 @@
 Background worker task handler for asynchronous wiki generation.
 """
 
+import asyncio
+
 from loguru import logger
 
+from src.core.config import settings
 from src.models.api_schema import WikiGenerationRequest
+from src.services.active_tasks import (
+    cancel_requested,
+    register_determiner,
+    register_run,
+    request_cancel,
+    unregister_determiner,
+    unregister_run,
+)
+from src.services.result_cache import get_result_cache
 from src.services.structure_analyzer import WikiStructureDeterminer
-from src.services.task_store import update_task_status
+from src.services.task_store import get_task, touch_task, update_task_status
 from src.services.wiki_generator import WikiGenerationService
 
 
+def _structure_summary(determiner: WikiStructureDeterminer) -> dict:
+    structure = determiner.wiki_structure
+    return {
+        "message": "Wiki structure determined; generating pages.",
+        "title": structure.title if structure else None,
+        "description": structure.description if structure else None,
+        "total_pages": len(structure.pages) if structure else 0,
+    }
+
+
+def _result_pages(determiner: WikiStructureDeterminer) -> list[dict]:
+    """
+    Every page as kept in the task result, with the content of finished ones.
+    Page content is stored only here; the API rebuilds the markdown from it.
+    """
+    return [
+        preview.model_copy(
+            update={"status": "pending"} if preview.status == "generating" else {}
+        ).model_dump()
+        for preview in determiner.page_previews(partial_content=False)
+    ]
+
+
+def _cancelled_result(determiner: WikiStructureDeterminer | None) -> dict:
+    """Task result of a cancelled task, keeping the pages finished so far."""
+    result: dict = {"message": "Task cancelled."}
+    if determiner and determiner.wiki_structure:
+        structure = determiner.wiki_structure
+        result.update(
+            title=structure.title,
+            description=structure.description,
+            total_pages=len(structure.pages),
+            pages=_result_pages(determiner),
+        )
+    return result
+
+
 async def process_wiki_generation_task(
     task_id: str,
     request: WikiGenerationRequest,
     determiner: WikiStructureDeterminer | None = None,  # If None, start from scratch
     save_file: bool = False,
+    commit_sha: str | None = None,
 ):
     """
     Unified background task handler.
+    The generation runs as a child task registered in `active_tasks`, so it can
+    be cancelled from the API (`DELETE /tasks/{task_id}`). With the worker
+    pool, cancellation is picked up from the task store instead.
     """
-    service = WikiGenerationService(request)
+    task = await asyncio.to_thread(get_task, task_id)
+    if task and task.status == "cancelled":
+        logger.info(f"Task {task_id} was cancelled before it started")
+        return
+
+    run = asyncio.create_task(
+        _run_wiki_generation(task_id, request, determiner, save_file, commit_sha)
+    )
+    register_run(task_id, run)
+    heartbeat = asyncio.create_task(_heartbeat(task_id, run))
+    watcher = None
+    if settings.JOB_QUEUE_ENABLED:
+        watcher = asyncio.create_task(_watch_for_cancellation(task_id, run))
 
     try:
-        # 1. Wiki generation (text)
-        markdown_content = await service.generate_wiki(determiner)
+        await run
+    finally:
+        heartbeat.cancel()
+        if watcher:
+            watcher.cancel()
+        unregister_run(task_id)
+
+
+async def _heartbeat(task_id: str, run: asyncio.Task) -> None:
+    """
+    Refreshes the task's heartbeat while `run` is alive, so identical requests
+    keep attaching to it (a task left by a killed process goes stale).
+    """
+    while not run.done():
+        await asyncio.sleep(settings.TASK_STALE_SECONDS / 4)
+        try:
+            await asyncio.to_thread(touch_task, task_id)
+        except Exception as e:
+            logger.warning(f"Task {task_id}: heartbeat failed: {e}")
+
+
+async def _watch_for_cancellation(task_id: str, run: asyncio.Task) -> None:
+    """Cancels `run` once the task is marked cancelled in the (shared) store."""
+    while not run.done():
+        await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+        task = await asyncio.to_thread(get_task, task_id)
+        if task and task.status == "cancelled":
+            request_cancel(task_id)
+            return
 
-        result = {"markdown_content": markdown_content}
 
-        # 2. Save file (optional)
+async def _run_wiki_generation(
+    task_id: str,
+    request: WikiGenerationRequest,
+    determiner: WikiStructureDeterminer | None,
+    save_file: bool,
+    commit_sha: str | None,
+):
+    """
+    Determines the wiki structure unless a determiner is given, then generates
+    the pages. The finished wiki is stored in the result cache under
+    `commit_sha` (resolved here before generation if not given).
+    """
+    service = WikiGenerationService(request, commit_sha=commit_sha)
+
+    try:
+        # Pin the commit before generating, so the cache entry matches the content
+        if get_result_cache():
+            await service.resolve_commit_sha()
+
+        # 1. Wiki structure; title and description become visible in the status
+        if determiner is None:
+            determiner = await service.prepare_generation()
+        determiner.bind_task(task_id)
+        register_determiner(task_id, determiner)
+        await asyncio.to_thread(
+            update_task_status, task_id, "in_progress", _structure_summary(determiner)
+        )
+
+        # 2. Wiki generation (text)
+        generated = await service.generate_wiki_with_structure(determiner)
+        markdown_content = generated["markdown"]
+        await service.store_cached_result(generated)
+
+        result = {
+            "title": generated["structure"].title,
+            "description": generated["structure"].description,
+            "total_pages": len(generated["structure"].pages),
+            "pages": _result_pages(determiner),
+        }
+
+        # 3. Save file (optional)
         if save_file:
             file_path = await service.save_to_file(markdown_content)
             result["file_path"] = file_path
 
-        # 3. Update task status to completed
-        update_task_status(task_id, "completed", result)
+        # 4. Update task status to completed
+        if await asyncio.to_thread(update_task_status, task_id, "completed", result):
+            determiner.events.publish(
+                "task_completed", file_path=result.get("file_path")
+            )
+
+    except asyncio.CancelledError:
+        if not cancel_requested(task_id):
+            # Shutdown of the server or worker: record it, but let the
+            # cancellation propagate to whoever is shutting down.
+            error = "Task interrupted by shutdown."
+            logger.warning(f"Task {task_id}: {error}")
+            await asyncio.to_thread(
+                update_task_status, task_id, "failed", {"error": error}
+            )
+            if determiner:
+                determiner.events.publish("task_failed", error=error)
+            raise
+
+        # Cancellation was requested for this task only; record it and end the
+        # run normally (in-flight LLM calls and fetches are already aborted).
+        logger.info(f"Task {task_id} cancelled")
+        result = _cancelled_result(determiner)
+        await asyncio.to_thread(update_task_status, task_id, "cancelled", result)
+        if determiner:
+            determiner.events.publish(
+                "task_cancelled", completed_pages=len(result.get("pages", {}))
+            )
 
     except Exception as e:
         logger.exception(f"Task {task_id} failed")
-        update_task_status(task_id, "failed", {"error": str(e)})
+        await asyncio.to_thread(
+            update_task_status, task_id, "failed", {"error": str(e)}
+        )
+        if determiner:
+            determiner.events.publish("task_failed", error=str(e))
 
     finally:
-        # If a determiner was injected from outside, it's safer to close it here
+        unregister_determiner(task_id)
+
         if determiner:
             await determiner.close()
@@ -0,0 +1,152 @@
+"""src.utils.file_content
+Binary detection and size caps for source files before they are put into prompts.
+"""
+
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from loguru import logger
+
+from src.core.config import settings
+
+# Leading bytes inspected to tell binary from text. As in git, a NUL byte in
+# them marks a binary file.
+BINARY_SNIFF_BYTES = 8000
+
+
+def is_binary(sample: bytes) -> bool:
+    return b"\0" in sample[:BINARY_SNIFF_BYTES]
+
+
+def format_excerpt(head: bytes, tail: bytes, total_bytes: int) -> str:
+    """Joins the head and tail of an oversized file, cut at line boundaries."""
+    head_text = head.decode("utf-8", errors="ignore")
+    tail_text = tail.decode("utf-8", errors="ignore")
+    cut = head_text.rfind("\n")
+    if cut > 0:
+        head_text = head_text[:cut]
+    cut = tail_text.find("\n")
+    if 0 <= cut < len(tail_text) - 1:
+        tail_text = tail_text[cut + 1 :]
+    omitted = total_bytes - len(head) - len(tail)
+    return (
+        f"{head_text}\n"
+        f"... [truncated: {omitted} of {total_bytes} bytes omitted] ...\n"
+        f"{tail_text}"
+    )
+
+
+def _split(data: bytes, max_bytes: int) -> tuple[bytes, bytes]:
+    half = max_bytes // 2
+    return data[:half], data[len(data) - half :]
+
+
+def text_from_bytes(
+    data: bytes, file_path: str, max_bytes: int | None = None
+) -> str | None:
+    """
+    Decodes file content for a prompt: None for binary files, a head-and-tail
+    excerpt for files over `max_bytes` (default: MAX_FILE_BYTES).
+    """
+    max_bytes = settings.MAX_FILE_BYTES if max_bytes is None else max_bytes
+    if is_binary(data):
+        logger.info(f"Skipping binary file '{file_path}'")
+        return None
+    if len(data) > max_bytes:
+        logger.info(f"Using an excerpt of '{file_path}' ({len(data)} bytes)")
+        return format_excerpt(*_split(data, max_bytes), len(data))
+    return data.decode("utf-8", errors="ignore")
+
+
+def read_text_file(
+    path: str | Path, file_path: str, max_bytes: int | None = None
+) -> str | None:
+    """
+    [Synchronous Function] Reads a local file like `text_from_bytes`, but
+    checks the size first so only the head and tail of large files are read.
+    """
+    max_bytes = settings.MAX_FILE_BYTES if max_bytes is None else max_bytes
+    size = os.stat(path).st_size
+    with open(path, "rb") as f:
+        if size <= max_bytes:
+            return text_from_bytes(f.read(), file_path, max_bytes)
+
+        head = f.read(max_bytes // 2)
+        if is_binary(head):
+            logger.info(f"Skipping binary file '{file_path}'")
+            return None
+        f.seek(max(size - max_bytes // 2, len(head)))
+        tail = f.read()
+    logger.info(f"Using an excerpt of '{file_path}' ({size} bytes)")
+    return format_excerpt(head, tail, size)
+
+
+async def read_stream_text(
+    chunks: AsyncIterator[bytes], file_path: str, max_bytes: int | None = None
+) -> str | None:
+    """
+    Reads a streamed download like `text_from_bytes` in bounded memory: past
+    `max_bytes` only the head and a rolling tail are kept, and binary files
+    are abandoned as soon as the leading bytes have been inspected.
+    """
+    max_bytes = settings.MAX_FILE_BYTES if max_bytes is None else max_bytes
+    data = bytearray()
+    tail: bytes | None = None
+    total = 0
+    sniffed = False
+
+    async for chunk in chunks:
+        total += len(chunk)
+        if tail is None:
+            data += chunk
+            if len(data) > max_bytes:
+                head, tail = _split(bytes(data), max_bytes)
+                data = bytearray(head)
+        else:
+            tail = (tail + chunk)[len(tail) + len(chunk) - max_bytes // 2 :]
+
+        if not sniffed and (len(data) >= BINARY_SNIFF_BYTES or tail is not None):
+            sniffed = True
+            if is_binary(data):
+                logger.info(f"Skipping binary file '{file_path}'")
+                return None
+
+    if tail is None:
+        return text_from_bytes(bytes(data), file_path, max_bytes)
+    logger.info(f"Using an excerpt of '{file_path}' ({total} bytes)")
+    return format_excerpt(bytes(data), tail, total)
+
+
+def cap_total_bytes(
+    files: list[tuple[str, str]], max_bytes: int
+) -> tuple[list[tuple[str, str]], list[str]]:
+    """
+    Caps the combined size of a page's `(path, content)` pairs. Small files
+    are kept whole while they fit their fair share; the rest of the allowance
+    is split evenly over the larger files, which are cut to head-and-tail
+    excerpts. Returns the capped files and the paths that were cut.
+    """
+    encoded = [(path, content.encode("utf-8")) for path, content in files]
+    if sum(len(data) for _, data in encoded) <= max_bytes:
+        return files, []
+
+    by_size = sorted(range(len(encoded)), key=lambda i: len(encoded[i][1]))
+    remaining = max_bytes
+    whole: set[int] = set()
+    for rank, index in enumerate(by_size):
+        if len(encoded[index][1]) > remaining // (len(by_size) - rank):
+            break
+        whole.add(index)
+        remaining -= len(encoded[index][1])
+    share = remaining // (len(encoded) - len(whole))
+
+    capped, cut = [], []
+    for index, (path, content) in enumerate(files):
+        if index in whole:
+            capped.append((path, content))
+            continue
+        data = encoded[index][1]
+        capped.append((path, format_excerpt(*_split(data, share), len(data))))
+        cut.append(path)
+    return capped, cut
@@ -3,13 +3,94 @@ Utility for filtering files based on ignore patterns.
 """
 
 import fnmatch
-from pathlib import Path
+import os
+import re
+from functools import lru_cache
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+class IgnoreMatcher:
+    """
+    A list of ignore patterns compiled for fast repeated matching.
+
+    A path is ignored if a pattern matches the whole (relative) path or any of
+    its components, e.g. "node_modules" ignores "a/node_modules/b.js" and
+    "*.pyc" ignores "dir/test.pyc". Patterns are split by kind so that a path
+    is classified in one pass instead of one fnmatch call per pattern and
+    component:
+
+    - literal names ("node_modules", "uv.lock"): a set lookup per component
+    - plain suffix globs ("*.pyc"): one `str.endswith(tuple)` per component
+    - any other glob: a single combined regular expression
+    """
+
+    def __init__(self, patterns: list[str] | tuple[str, ...]):
+        literals: set[str] = set()
+        suffixes: list[str] = []
+        globs: list[str] = []
+
+        for pattern in patterns:
+            pattern = os.path.normcase(pattern)
+            if not _GLOB_CHARS.intersection(pattern):
+                literals.add(pattern)
+            elif (
+                pattern.startswith("*")
+                and len(pattern) > 1
+                and "/" not in pattern
+                and not _GLOB_CHARS.intersection(pattern[1:])
+            ):
+                suffixes.append(pattern[1:])
+            else:
+                globs.append(pattern)
+
+        self.literals = frozenset(literals)
+        self.suffixes = tuple(suffixes)
+        self.glob_regex = (
+            re.compile("|".join(fnmatch.translate(glob) for glob in globs))
+            if globs
+            else None
+        )
+
+    def matches(self, path: str) -> bool:
+        """True if the path (relative, '/' or '\\' separated) should be ignored."""
+        normalized_path = os.path.normcase(path.replace("\\", "/"))
+        parts = [part for part in normalized_path.split("/") if part and part != "."]
+        if normalized_path.startswith("/"):
+            parts.insert(0, "/")
+
+        literals, suffixes, glob_regex = self.literals, self.suffixes, self.glob_regex
+        if normalized_path in literals:
+            return True
+        if glob_regex is not None and glob_regex.match(normalized_path):
+            return True
+        for part in parts:
+            if part in literals:
+                return True
+            if suffixes and part.endswith(suffixes):
+                return True
+            if glob_regex is not None and glob_regex.match(part):
+                return True
+        return False
+
+
+@lru_cache(maxsize=32)
+def _compile(patterns: tuple[str, ...]) -> IgnoreMatcher:
+    return IgnoreMatcher(patterns)
+
+
+def compile_ignore_patterns(patterns: list[str]) -> IgnoreMatcher:
+    """Returns the compiled matcher for a pattern list (cached per list)."""
+    return _compile(tuple(patterns))
 
 
 def should_ignore(path: str, patterns: list[str]) -> bool:
     """
     Determines if a file path should be ignored based on a list of patterns.
 
+    For many paths, compile the patterns once with `compile_ignore_patterns`
+    and call `matches` instead.
+
     Args:
         path: The file path to check (relative path).
         patterns: List of glob patterns to ignore (e.g., ["*.pyc", "node_modules"]).
@@ -19,32 +100,4 @@ def should_ignore(path: str, patterns: list[str]) -> bool:
     """
     if not patterns:
         return False
-
-    # 1. Normalize path separators (Handle Windows backslashes)
-    # path.replace("\", "/") -> Syntax Error! Fixed to "\\"
-    normalized_path = path.replace("\\", "/")
-    path_obj = Path(normalized_path)
-
-    for pattern in patterns:
-        # 1. Direct match with the full relative path (Most common)
-        # e.g., pattern="src/temp/*", path="src/temp/file.txt"
-        if fnmatch.fnmatch(normalized_path, pattern):
-            return True
-
-        # 2. Match against the file name
-        # e.g., pattern="*.pyc", path="dir/test.pyc"
-        if fnmatch.fnmatch(path_obj.name, pattern):
-            return True
-
-        # 3. Match against any directory component (Recursive check)
-        # This handles filtering out entire directories regardless of depth.
-        # e.g., pattern="node_modules", path="a/b/node_modules/c.js"
-        # fnmatch is slightly expensive, so we check strictly for name matches first if possible
-        if pattern in path_obj.parts:
-            return True
-
-        # If the pattern contains wildcards, we need fnmatch for parts
-        if any(fnmatch.fnmatch(part, pattern) for part in path_obj.parts):
-            return True
-
-    return False
+    return compile_ignore_patterns(patterns).matches(path)
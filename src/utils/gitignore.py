@@ -0,0 +1,180 @@
+"""src.utils.gitignore
+Matching of paths against a repository's .gitignore files, with git's semantics.
+"""
+
+import os
+import re
+
+_GLOB_CHARS = frozenset("*?[\\")
+
+
+class GitIgnoreRule:
+    """
+    One pattern line of an ignore file.
+
+    `base` is the directory (relative to the repository root, "" for the root)
+    of the file that defined the rule; anchored patterns match relative to it.
+    """
+
+    __slots__ = ("base", "negated", "dir_only", "anchored", "literal", "regex")
+
+    def __init__(self, pattern: str, base: str):
+        self.base = base
+        self.negated = pattern.startswith("!")
+        if self.negated or pattern.startswith(("\\!", "\\#")):
+            pattern = pattern[1:]
+
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # A separator at the start or in the middle anchors the pattern to the
+        # directory of the ignore file; otherwise it matches a name at any depth.
+        self.anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        self.literal = pattern if not _GLOB_CHARS.intersection(pattern) else None
+        self.regex = None if self.literal is not None else _translate(pattern)
+
+    def matches(self, rel_path: str, name: str, is_dir: bool) -> bool:
+        """`rel_path` is relative to the repository root, `name` its last component."""
+        if self.dir_only and not is_dir:
+            return False
+        if self.anchored:
+            if self.base:
+                if not rel_path.startswith(self.base + "/"):
+                    return False
+                rel_path = rel_path[len(self.base) + 1 :]
+            target = rel_path
+        else:
+            target = name
+        if self.literal is not None:
+            return target == self.literal
+        return self.regex.fullmatch(target) is not None
+
+
+def _translate(pattern: str) -> re.Pattern:
+    """Translates a gitignore glob into a regex ('*' and '?' never match '/')."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+                if i + 2 == n:
+                    # "dir/**": everything inside
+                    out.append(".*")
+                    i += 2
+                    continue
+                if pattern[i + 2] == "/":
+                    # "**/x" or "a/**/b": zero or more directories
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+            while i + 1 < n and pattern[i + 1] == "*":
+                i += 1
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+            else:
+                chars = pattern[i + 1 : j]
+                if chars[0] in "!^":
+                    chars = "^" + chars[1:]
+                out.append("[" + chars.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out), re.DOTALL)
+
+
+def parse_ignore_file(text: str, base: str = "") -> list[GitIgnoreRule]:
+    """Parses the content of an ignore file located in directory `base`."""
+    rules = []
+    for line in text.splitlines():
+        # Trailing spaces are ignored unless escaped with a backslash.
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        if not stripped or stripped.startswith("#"):
+            continue
+        rule = GitIgnoreRule(stripped, base)
+        if rule.literal == "" and rule.regex is None:
+            continue
+        rules.append(rule)
+    return rules
+
+
+class GitIgnore:
+    """
+    The ignore rules of a working tree: `.git/info/exclude`, the root
+    `.gitignore` and every nested `.gitignore`, loaded lazily as directories
+    are visited.
+
+    As in git, the last matching rule wins, rules of deeper ignore files take
+    precedence over their parents', and a path inside an ignored directory is
+    ignored regardless of negations (callers prune ignored directories).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        exclude = self._read(os.path.join(root, ".git", "info", "exclude"))
+        gitignore = self._read(os.path.join(root, ".gitignore"))
+        root_rules = parse_ignore_file(exclude) + parse_ignore_file(gitignore)
+        self._rules: dict[str, tuple[GitIgnoreRule, ...]] = {"": tuple(root_rules)}
+        self._excluded_dirs: dict[str, bool] = {"": False}
+
+    @staticmethod
+    def _read(path: str) -> str:
+        try:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def rules_for(self, rel_dir: str) -> tuple[GitIgnoreRule, ...]:
+        """Rules in effect inside `rel_dir` (relative, '/' separated; "" is the root)."""
+        rules = self._rules.get(rel_dir)
+        if rules is None:
+            parent, _, _ = rel_dir.rpartition("/")
+            text = self._read(os.path.join(self.root, rel_dir, ".gitignore"))
+            rules = self.rules_for(parent) + tuple(parse_ignore_file(text, rel_dir))
+            self._rules[rel_dir] = rules
+        return rules
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """True if the last matching rule for `rel_path` is not a negation."""
+        parent, _, name = rel_path.rpartition("/")
+        for rule in reversed(self.rules_for(parent)):
+            if rule.matches(rel_path, name, is_dir):
+                return not rule.negated
+        return False
+
+    def excludes(self, rel_path: str) -> bool:
+        """
+        True if the file `rel_path` or one of its parent directories is ignored,
+        i.e. a walk that prunes ignored directories would not list it.
+        """
+        parent = rel_path.rpartition("/")[0]
+        return self._dir_excluded(parent) or self.is_ignored(rel_path)
+
+    def _dir_excluded(self, rel_dir: str) -> bool:
+        excluded = self._excluded_dirs.get(rel_dir)
+        if excluded is None:
+            parent = rel_dir.rpartition("/")[0]
+            excluded = self._dir_excluded(parent) or self.is_ignored(
+                rel_dir, is_dir=True
+            )
+            self._excluded_dirs[rel_dir] = excluded
+        return excluded
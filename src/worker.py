@@ -0,0 +1,108 @@
+"""src.worker
+Worker pool entry point: runs queued wiki generation jobs outside the API process.
+
+Usage: python -m src.worker  (requires JOB_QUEUE_ENABLED=true on the API server)
+"""
+
+from src.core.logger_config import setup_logging
+
+setup_logging()
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+
+from loguru import logger
+
+from src.core.config import settings
+from src.services.job_queue import get_job_queue
+from src.services.task_store import update_task_status
+from src.services.wiki_worker import process_wiki_generation_task
+
+# Seconds between liveness checks of the worker processes
+SUPERVISOR_INTERVAL_SECONDS = 5.0
+
+
+async def _run_worker(worker: str) -> None:
+    """Claims and runs jobs one at a time until the process is terminated."""
+    queue = get_job_queue()
+    logger.info(f"Worker {worker} started (pid {os.getpid()})")
+
+    while True:
+        job = await asyncio.to_thread(queue.claim, worker)
+        if job is None:
+            await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+            continue
+
+        logger.info(f"Worker {worker} running task {job.task_id}")
+        try:
+            await process_wiki_generation_task(
+                task_id=job.task_id, request=job.request, save_file=job.save_file
+            )
+        finally:
+            await asyncio.to_thread(queue.finish, job.job_id)
+
+
+def _worker_main(worker: str) -> None:
+    setup_logging()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    asyncio.run(_run_worker(worker))
+
+
+def _start_worker(worker: str) -> multiprocessing.Process:
+    process = multiprocessing.get_context("spawn").Process(
+        target=_worker_main, args=(worker,), name=worker, daemon=True
+    )
+    process.start()
+    return process
+
+
+def main() -> None:
+    if settings.TASK_STORE_BACKEND != "sqlite":
+        logger.warning(
+            "TASK_STORE_BACKEND is not 'sqlite'; task status written by workers "
+            "will not be visible to the API server."
+        )
+
+    queue = get_job_queue()
+    if requeued := queue.requeue_running():
+        logger.info(f"Requeued {requeued} job(s) left running by a previous pool")
+
+    workers = {
+        f"worker-{i}": _start_worker(f"worker-{i}") for i in range(settings.JOB_WORKERS)
+    }
+    logger.info(f"Started {len(workers)} worker process(es)")
+
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    # Supervise: a crashed worker's job is failed and the worker restarted.
+    while not stopping:
+        time.sleep(SUPERVISOR_INTERVAL_SECONDS)
+        for name, process in workers.items():
+            if process.is_alive() or stopping:
+                continue
+            logger.error(f"{name} exited with code {process.exitcode}; restarting")
+            for task_id in queue.release_worker(name):
+                update_task_status(
+                    task_id, "failed", {"error": "Worker process exited unexpectedly."}
+                )
+            workers[name] = _start_worker(name)
+
+    logger.info("Stopping worker pool...")
+    for process in workers.values():
+        process.terminate()
+    for process in workers.values():
+        process.join(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
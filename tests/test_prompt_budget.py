@@ -0,0 +1,45 @@
+import unittest
+
+from src.services.prompt_budget import PromptBudgeter
+
+
+class LineCounter:
+    """Counts one token per line, so file sizes are exact in the tests."""
+
+    context_window = 10_000
+
+    def count(self, text: str) -> int:
+        return text.count("\n")
+
+
+def _file(path: str, lines: int) -> tuple[str, str]:
+    return path, "".join(f"{path} line {i}\n" for i in range(lines))
+
+
+class PromptBudgeterTest(unittest.TestCase):
+    def test_drops_raise_the_share_until_remaining_files_fit_whole(self):
+        files = [_file(f"f{i}", 300) for i in range(5)]
+
+        fitted, report = PromptBudgeter(LineCounter(), 1000).fit(files)
+
+        self.assertEqual(report.included, ["f0", "f1", "f2"])
+        self.assertEqual(report.truncated, [])
+        self.assertEqual(report.dropped, ["f4", "f3"])
+        self.assertEqual(report.used_tokens, 900)
+        self.assertEqual(fitted, files[:3])
+
+    def test_truncated_files_share_the_remaining_budget(self):
+        files = [_file("small", 100), _file("big1", 2000), _file("big2", 3000)]
+
+        fitted, report = PromptBudgeter(LineCounter(), 1100).fit(files)
+
+        self.assertEqual(report.included, ["small"])
+        self.assertEqual(report.truncated, ["big1", "big2"])
+        self.assertEqual(report.used_tokens, 1100)
+        for _, content in fitted[1:]:
+            self.assertIn("~", content)
+            self.assertNotIn("~-", content)
+
+
+if __name__ == "__main__":
+    unittest.main()